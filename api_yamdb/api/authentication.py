@@ -0,0 +1,64 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import User
+
+CLAIMS = ('username', 'role', 'is_staff')
+CHANGED_USER_KEY = 'auth:changed:{user_id}'
+# Поля, изменение которых не влияет на данные в токене.
+IGNORED_FIELDS = {'confirmation_code', 'last_login'}
+
+
+def token_for_user(user):
+    token = AccessToken.for_user(user)
+    for claim in CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def mark_user_changed(user_id):
+    caches[settings.API_CACHE_ALIAS].set(
+        CHANGED_USER_KEY.format(user_id=user_id),
+        int(time.time()),
+        settings.JWT_CHANGED_USERS_TTL
+    )
+
+
+def changed_after_issue(validated_token):
+    changed = caches[settings.API_CACHE_ALIAS].get(
+        CHANGED_USER_KEY.format(
+            user_id=validated_token[api_settings.USER_ID_CLAIM]
+        )
+    )
+    return changed is not None and changed >= validated_token['iat']
+
+
+def load_user(user):
+    if getattr(user, 'from_token', False):
+        return User.objects.get(pk=user.pk)
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        if (
+            not settings.JWT_TRUST_CLAIMS
+            or api_settings.USER_ID_CLAIM not in validated_token
+            or 'iat' not in validated_token
+            or any(claim not in validated_token for claim in CLAIMS)
+            or changed_after_issue(validated_token)
+        ):
+            return super().get_user(validated_token)
+        user = User(
+            pk=validated_token[api_settings.USER_ID_CLAIM],
+            is_active=True,
+            **{claim: validated_token[claim] for claim in CLAIMS}
+        )
+        user._state.adding = False
+        user.from_token = True
+        return user
@@ -0,0 +1,359 @@
+from collections import Counter, defaultdict, namedtuple
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from reviews.aggregates import (apply_comment_delta, apply_review_delta,
+                                apply_stats_delta, touch_titles, touched)
+from reviews.models import (Category, Comments, Genre, Review, Title,
+                            TitleStats, User)
+from reviews.search import update_search_vectors
+
+from .cache import invalidate
+from .serializers import (DUPLICATE_REVIEW, BulkCommentSerializer,
+                          BulkReviewSerializer, BulkTitleSerializer)
+
+CREATED = 'created'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+ERROR = 'error'
+TITLE_NOT_FOUND = 'Произведение не найдено.'
+REVIEW_NOT_FOUND = 'Отзыв не найден.'
+AUTHOR_NOT_FOUND = 'Пользователь не найден.'
+CATEGORY_NOT_FOUND = 'Категория не найдена.'
+GENRES_NOT_FOUND = 'Жанры не найдены: {slugs}'
+DUPLICATE_TITLE = 'Произведение с таким названием и годом уже есть в запросе.'
+
+TitleRow = namedtuple('TitleRow', 'index title genre_ids created changed')
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def validate_items(items, serializer_class):
+    results = []
+    valid = []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+            results.append(None)
+        else:
+            results.append(
+                {'index': index, 'status': ERROR, 'errors': serializer.errors}
+            )
+    return results, valid
+
+
+def resolve_authors(valid):
+    return dict(User.objects.filter(
+        username__in={data['author'] for _, data in valid}
+    ).values_list('username', 'pk'))
+
+
+def reject(results, index, errors):
+    results[index] = {'index': index, 'status': ERROR, 'errors': errors}
+
+
+def insert_rows(model, chunk, results, conflict):
+    # Пачка нарушила ограничение (например, такой же отзыв создан
+    # параллельным запросом): вставляем строки по одной, каждую в своей
+    # точке сохранения, и отклоняем только конфликтующие.
+    saved = []
+    for index, obj in chunk:
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([obj])
+        except IntegrityError:
+            reject(results, index, conflict)
+        else:
+            saved.append((index, obj))
+    return saved
+
+
+def save_chunks(objects, results, chunk_size, after_chunk, conflict,
+                read_ids=None):
+    model = type(objects[0][1])
+    for chunk in chunks(objects, chunk_size):
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create([obj for _, obj in chunk])
+            except IntegrityError:
+                chunk = insert_rows(model, chunk, results, conflict)
+            after_chunk([obj for _, obj in chunk])
+        if chunk and chunk[0][1].pk is None and read_ids:
+            # Не PostgreSQL: bulk_create не возвращает id, дочитываем их.
+            read_ids([obj for _, obj in chunk])
+        for index, obj in chunk:
+            results[index] = {'index': index, 'status': CREATED,
+                              'id': obj.pk}
+
+
+def read_review_ids(reviews):
+    ids = dict(
+        ((title_id, author_id), pk)
+        for title_id, author_id, pk in Review.objects.filter(
+            title_id__in={review.title_id for review in reviews},
+            author_id__in={review.author_id for review in reviews},
+        ).values_list('title_id', 'author_id', 'pk')
+    )
+    for review in reviews:
+        review.pk = ids[(review.title_id, review.author_id)]
+
+
+def create_reviews(items, chunk_size):
+    results, valid = validate_items(items, BulkReviewSerializer)
+    authors = resolve_authors(valid)
+    title_ids = {data['title'] for _, data in valid}
+    existing_titles = set(Title.objects.filter(
+        pk__in=title_ids
+    ).values_list('pk', flat=True))
+    taken = set(Review.objects.filter(
+        title_id__in=existing_titles,
+        author_id__in=authors.values(),
+    ).values_list('title_id', 'author_id'))
+    reviews = []
+    for index, data in valid:
+        author_id = authors.get(data['author'])
+        if data['title'] not in existing_titles:
+            reject(results, index, {'title': [TITLE_NOT_FOUND]})
+        elif author_id is None:
+            reject(results, index, {'author': [AUTHOR_NOT_FOUND]})
+        elif (data['title'], author_id) in taken:
+            reject(results, index, {'non_field_errors': [DUPLICATE_REVIEW]})
+        else:
+            taken.add((data['title'], author_id))
+            reviews.append((index, Review(
+                title_id=data['title'],
+                author_id=author_id,
+                text=data['text'],
+                score=data['score'],
+            )))
+    if reviews:
+        save_chunks(
+            reviews, results, chunk_size, update_ratings,
+            {'non_field_errors': [DUPLICATE_REVIEW]}, read_review_ids
+        )
+    return results
+
+
+def update_ratings(reviews):
+    scores = defaultdict(Counter)
+    for review in reviews:
+        scores[review.title_id][review.score] += 1
+    for title_id, score_counts in scores.items():
+        apply_review_delta(
+            title_id,
+            sum(score * count for score, count in score_counts.items()),
+            sum(score_counts.values())
+        )
+        apply_stats_delta(title_id, score_counts)
+
+
+def create_comments(items, chunk_size):
+    results, valid = validate_items(items, BulkCommentSerializer)
+    authors = resolve_authors(valid)
+    existing_reviews = set(Review.objects.filter(
+        pk__in={data['review'] for _, data in valid}
+    ).values_list('pk', flat=True))
+    comments = []
+    for index, data in valid:
+        author_id = authors.get(data['author'])
+        if data['review'] not in existing_reviews:
+            reject(results, index, {'review': [REVIEW_NOT_FOUND]})
+        elif author_id is None:
+            reject(results, index, {'author': [AUTHOR_NOT_FOUND]})
+        else:
+            comments.append((index, Comments(
+                review_id=data['review'],
+                author_id=author_id,
+                text=data['text'],
+            )))
+    if comments:
+        # У комментария нет естественного ключа, по которому можно найти
+        # вставленные строки: не на PostgreSQL в результатах 'id': None.
+        save_chunks(
+            comments, results, chunk_size, update_comment_counts,
+            {'review': [REVIEW_NOT_FOUND]}
+        )
+    return results
+
+
+def update_comment_counts(comments):
+    counts = Counter(comment.review_id for comment in comments)
+    for review_id, count in counts.items():
+        apply_comment_delta(review_id, count)
+    touch_titles(reviews__in=counts.keys())
+
+
+def slug_map(model, slugs):
+    return dict(
+        model.objects.filter(slug__in=slugs).values_list('slug', 'pk')
+    )
+
+
+def title_errors(data, categories, genres):
+    errors = {}
+    if data['category'] not in categories:
+        errors['category'] = [CATEGORY_NOT_FOUND]
+    missing = [slug for slug in data['genre'] if slug not in genres]
+    if missing:
+        errors['genre'] = [GENRES_NOT_FOUND.format(slugs=', '.join(missing))]
+    return errors
+
+
+def existing_titles(keys):
+    # В базе natural key не уникален: при дублях берём самую раннюю запись.
+    return {
+        (title.name, title.year): title
+        for title in Title.objects.filter(
+            name__in={name for name, _ in keys},
+            year__in={year for _, year in keys},
+        ).only(
+            'pk', 'name', 'year', 'description', 'category_id'
+        ).order_by('-pk')
+    }
+
+
+def fill(title, data, category_id):
+    if (
+        title.description == data['description']
+        and title.category_id == category_id
+    ):
+        return False
+    title.description = data['description']
+    title.category_id = category_id
+    return True
+
+
+def prepare_titles(items):
+    results, valid = validate_items(items, BulkTitleSerializer)
+    categories = slug_map(Category, {data['category'] for _, data in valid})
+    genres = slug_map(
+        Genre, {slug for _, data in valid for slug in data['genre']}
+    )
+    titles = existing_titles(
+        {(data['name'], data['year']) for _, data in valid}
+    )
+    rows = []
+    seen = set()
+    for index, data in valid:
+        key = (data['name'], data['year'])
+        errors = title_errors(data, categories, genres)
+        if key in seen:
+            errors['non_field_errors'] = [DUPLICATE_TITLE]
+        if errors:
+            reject(results, index, errors)
+            continue
+        seen.add(key)
+        title = titles.get(key) or Title(name=data['name'], year=data['year'])
+        rows.append(TitleRow(
+            index=index,
+            title=title,
+            genre_ids={genres[slug] for slug in data['genre']},
+            created=title.pk is None,
+            changed=fill(title, data, categories[data['category']]),
+        ))
+    return results, rows
+
+
+def create_titles(rows):
+    titles = [row.title for row in rows if row.created]
+    Title.objects.bulk_create(titles, batch_size=settings.BULK_BATCH_SIZE)
+    if titles and titles[0].pk is None:
+        # Не PostgreSQL: bulk_create не возвращает id, дочитываем их.
+        created = existing_titles({
+            (title.name, title.year) for title in titles
+        })
+        for title in titles:
+            title.pk = created[(title.name, title.year)].pk
+    TitleStats.objects.bulk_create(
+        [TitleStats(title=title) for title in titles],
+        batch_size=settings.BULK_BATCH_SIZE
+    )
+
+
+def sync_genres(rows):
+    through = Title.genre.through
+    links = set(through.objects.filter(
+        title_id__in=[row.title.pk for row in rows]
+    ).values_list('title_id', 'genre_id'))
+    wanted = {
+        (row.title.pk, genre_id) for row in rows for genre_id in row.genre_ids
+    }
+    stale = defaultdict(list)
+    for title_id, genre_id in links - wanted:
+        stale[title_id].append(genre_id)
+    if stale:
+        condition = Q()
+        for title_id, genre_ids in stale.items():
+            condition |= Q(title_id=title_id, genre_id__in=genre_ids)
+        through.objects.filter(condition).delete()
+    through.objects.bulk_create(
+        [through(title_id=title_id, genre_id=genre_id)
+         for title_id, genre_id in wanted - links],
+        batch_size=settings.BULK_BATCH_SIZE
+    )
+    return {title_id for title_id, _ in links ^ wanted}
+
+
+def save_titles(rows):
+    create_titles(rows)
+    relinked = sync_genres(rows)
+    updated = [
+        row.title for row in rows
+        if not row.created and (row.changed or row.title.pk in relinked)
+    ]
+    for title in updated:
+        for field, value in touched().items():
+            setattr(title, field, value)
+    Title.objects.bulk_update(
+        updated,
+        ['description', 'category', 'version', 'modified'],
+        batch_size=settings.BULK_BATCH_SIZE
+    )
+    update_search_vectors(pk__in=[
+        row.title.pk for row in rows if row.created or row.changed
+    ])
+    return {title.pk for title in updated}
+
+
+def upsert_chunk(items):
+    results, rows = prepare_titles(items)
+    if not rows:
+        return results
+    with transaction.atomic():
+        updated = save_titles(rows)
+        transaction.on_commit(partial(invalidate, 'titles'))
+    for row in rows:
+        if row.created:
+            status = CREATED
+        elif row.title.pk in updated:
+            status = UPDATED
+        else:
+            status = UNCHANGED
+        results[row.index] = {
+            'index': row.index, 'status': status, 'id': row.title.pk
+        }
+    return results
+
+
+def upsert_titles(items, chunk_size):
+    results = []
+    for start in range(0, len(items), chunk_size):
+        for result in upsert_chunk(items[start:start + chunk_size]):
+            result['index'] += start
+            results.append(result)
+    return results
+
+
+def get_chunk_size(request, total):
+    try:
+        chunk_size = int(request.query_params.get('chunk_size', total))
+    except ValueError:
+        chunk_size = total
+    return max(1, min(chunk_size, settings.BULK_MAX_ITEMS))
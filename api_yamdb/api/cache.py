@@ -0,0 +1,139 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+VERSION_KEY = 'api:version:{namespace}'
+RESPONSE_KEY = 'api:response:{version}:{digest}'
+STATS_KEY = 'api:stats:{counter}'
+CACHE_HEADER = 'X-Cache'
+
+DEPENDENT_NAMESPACES = {
+    'categories': ('categories', 'titles'),
+    'genres': ('genres', 'titles'),
+    'titles': ('titles',),
+}
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_version(namespace):
+    cache = get_cache()
+    key = VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        return cache.get(key)
+    return version
+
+
+def invalidate(namespace):
+    cache = get_cache()
+    for dependent in DEPENDENT_NAMESPACES[namespace]:
+        key = VERSION_KEY.format(namespace=dependent)
+        cache.set(
+            key,
+            max(int(time.time() * 1000), (cache.get(key) or 0) + 1),
+            None
+        )
+
+
+class StatsCounter:
+    # Попадания и промахи копятся в памяти процесса и раз в
+    # API_CACHE_STATS_INTERVAL секунд добавляются к общим счётчикам в кэше,
+    # а не стоят двух лишних обращений к кэшу на каждый запрос.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.flushed = time.monotonic()
+
+    def count(self, counter):
+        with self.lock:
+            self.pending[counter] += 1
+            if (
+                time.monotonic() - self.flushed
+                < settings.API_CACHE_STATS_INTERVAL
+            ):
+                return
+        self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.flushed = time.monotonic()
+        cache = get_cache()
+        for counter, value in pending.items():
+            key = STATS_KEY.format(counter=counter)
+            cache.add(key, 0, None)
+            try:
+                cache.incr(key, value)
+            except ValueError:
+                cache.set(key, value, None)
+
+
+stats = StatsCounter()
+
+
+def count(counter):
+    stats.count(counter)
+
+
+def cache_stats():
+    # Счётчики других процессов видны после их очередного сброса.
+    stats.flush()
+    cache = get_cache()
+    return {
+        counter: cache.get(STATS_KEY.format(counter=counter), 0)
+        for counter in ('hits', 'misses')
+    }
+
+
+class CachedResponseMixin:
+    cache_namespace = None
+
+    def get_cache_timeout(self):
+        return settings.API_CACHE_TIMEOUTS.get(
+            self.cache_namespace,
+            settings.API_CACHE_TIMEOUT
+        )
+
+    def get_response_cache_key(self, request):
+        digest = hashlib.md5(
+            request.build_absolute_uri().encode('utf-8')
+        ).hexdigest()
+        return RESPONSE_KEY.format(
+            version=get_version(self.cache_namespace),
+            digest=digest
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            count('hits')
+            return Response(data, headers={CACHE_HEADER: 'HIT'})
+        count('misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.get_cache_timeout())
+        response[CACHE_HEADER] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedDetailMixin(CachedResponseMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
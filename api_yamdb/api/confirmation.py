@@ -0,0 +1,95 @@
+import hashlib
+import hmac
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+STORED = 'stored'
+SIGNED = 'signed'
+USED_CODE_KEY = 'confirmation:used:{user_id}:{code}'
+NONCE_KEY = 'confirmation:nonce:{user_id}'
+
+
+def signed_mode():
+    return settings.CONFIRMATION_CODE_MODE == SIGNED
+
+
+def current_window():
+    return int(time.time() // settings.CONFIRMATION_CODE_TTL)
+
+
+def derive_code(user, secret, window, nonce):
+    digest = hmac.new(
+        secret.encode('utf-8'),
+        f'{user.pk}:{user.email}:{window}:{nonce}'.encode('utf-8'),
+        hashlib.sha256
+    ).digest()
+    number = int.from_bytes(digest, 'big')
+    alphabet = settings.REGULAR_CONFIRMATION_CODE
+    symbols = []
+    for _ in range(settings.MAX_LENGTH_CONFIRMATION_CODE):
+        number, index = divmod(number, len(alphabet))
+        symbols.append(alphabet[index])
+    return ''.join(symbols)
+
+
+def next_nonce(user):
+    # Номер выдачи входит в код: повторная регистрация даёт новый код, а
+    # не уже использованный. Начальное значение от времени, чтобы номера
+    # не повторились после вытеснения ключа из кэша.
+    cache = caches[settings.API_CACHE_ALIAS]
+    key = NONCE_KEY.format(user_id=user.pk)
+    nonce = max(int(time.time() * 1000), (cache.get(key) or 0) + 1)
+    cache.set(key, nonce, settings.CONFIRMATION_CODE_TTL * 2)
+    return nonce
+
+
+def issue_code(user):
+    if signed_mode():
+        return derive_code(
+            user, settings.CONFIRMATION_CODE_SECRETS[0], current_window(),
+            next_nonce(user)
+        )
+    user.confirmation_code = ''.join(random.sample(
+        settings.REGULAR_CONFIRMATION_CODE,
+        settings.MAX_LENGTH_CONFIRMATION_CODE
+    ))
+    user.save(update_fields=['confirmation_code'])
+    return user.confirmation_code
+
+
+def check_signed_code(user, code):
+    cache = caches[settings.API_CACHE_ALIAS]
+    nonce = cache.get(NONCE_KEY.format(user_id=user.pk))
+    if nonce is None:
+        return False
+    window = current_window()
+    if not any(
+        hmac.compare_digest(
+            derive_code(user, secret, valid_window, nonce), code
+        )
+        for secret in settings.CONFIRMATION_CODE_SECRETS
+        for valid_window in (window, window - 1)
+    ):
+        return False
+    # Код действителен до двух окон подряд: помечаем его использованным
+    # на всё это время, чтобы повторно получить токен было нельзя.
+    return cache.add(
+        USED_CODE_KEY.format(user_id=user.pk, code=code),
+        True,
+        settings.CONFIRMATION_CODE_TTL * 2
+    )
+
+
+def check_code(user, code):
+    if signed_mode():
+        return check_signed_code(user, code)
+    if user.confirmation_code == settings.DEFAULT_CONFIRMATION_CODE:
+        return False
+    if user.confirmation_code == code:
+        return True
+    user.confirmation_code = settings.DEFAULT_CONFIRMATION_CODE
+    user.save(update_fields=['confirmation_code'])
+    return False
@@ -1,7 +1,11 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 
+from .search import search_titles
 from reviews.models import Title
 
+SEARCH_PARAM = 'search'
+
 
 class TitlesFilter(filters.FilterSet):
 
@@ -9,7 +13,25 @@ class TitlesFilter(filters.FilterSet):
     category = filters.CharFilter(field_name='category__slug',)
     name = filters.CharFilter(field_name='name', lookup_expr='icontains',)
     year = filters.NumberFilter(field_name='year')
+    min_rating = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    max_rating = filters.NumberFilter(field_name='rating', lookup_expr='lte')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year',)
+        fields = ('category', 'genre', 'name', 'year',
+                  'min_rating', 'max_rating', 'search',)
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class TitlesOrderingFilter(OrderingFilter):
+
+    def get_ordering(self, request, queryset, view):
+        if (
+            request.query_params.get(SEARCH_PARAM)
+            and not request.query_params.get(self.ordering_param)
+        ):
+            return ('-search_rank', 'id')
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,10 @@
+from api.cache import cache_stats
+from django.core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Показывает статистику кэша ответов API'
+
+    def handle(self, *args, **kwargs):
+        for counter, value in cache_stats().items():
+            self.stdout.write(f'{counter}: {value}')
@@ -0,0 +1,39 @@
+import json
+from collections import Counter
+
+from api.bulk import ERROR, upsert_titles
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+
+def read_items(path):
+    with open(path, encoding='utf-8') as source:
+        text = source.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class Command(BaseCommand):
+    help = ('Создаёт или обновляет произведения по названию и году '
+            'из json-списка или ndjson')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.BULK_MAX_ITEMS
+        )
+
+    def handle(self, *args, **options):
+        try:
+            items = read_items(options['path'])
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        results = upsert_titles(items, max(1, options['chunk_size']))
+        for result in results:
+            if result['status'] == ERROR:
+                errors = json.dumps(result['errors'], ensure_ascii=False)
+                self.stderr.write(f'{result["index"]}: {errors}')
+        counts = Counter(result['status'] for result in results)
+        for status, count in sorted(counts.items()):
+            self.stdout.write(f'{status}: {count}')
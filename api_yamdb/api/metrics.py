@@ -0,0 +1,233 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.fields import empty
+from reviews import outbox
+
+from .cache import cache_stats
+
+METRIC_KEY = 'perf:{view}:{field}'
+VIEWS_KEY = 'perf:views'
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Время копится в микросекундах: incr в кэше работает только с целыми.
+FIELDS = (
+    'requests', 'duration_us', 'sql_queries', 'sql_us', 'serializer_us',
+) + tuple(f'bucket_{index}' for index in range(len(BUCKETS) + 1))
+UNRESOLVED = 'unresolved'
+
+state = threading.local()
+
+
+class RequestMetrics:
+    __slots__ = ('sql_queries', 'sql_time', 'serializer_time', 'depth')
+
+    def __init__(self):
+        self.sql_queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.depth = 0
+
+    def server_timing(self, duration):
+        return (
+            f'db;dur={self.sql_time * 1000:.1f};'
+            f'desc="{self.sql_queries} queries", '
+            f'serializer;dur={self.serializer_time * 1000:.1f}, '
+            f'total;dur={duration * 1000:.1f}'
+        )
+
+
+def current():
+    return getattr(state, 'metrics', None)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    metrics = current()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_queries += 1
+        metrics.sql_time += time.perf_counter() - started
+
+
+@contextmanager
+def serializer_timer():
+    metrics = current()
+    if metrics is None:
+        yield
+        return
+    # Вложенные сериализаторы не считаем повторно.
+    metrics.depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.depth -= 1
+        if metrics.depth == 0:
+            metrics.serializer_time += time.perf_counter() - started
+
+
+class TimedSerializerMixin:
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+    def run_validation(self, data=empty):
+        with serializer_timer():
+            return super().run_validation(data)
+
+
+def view_label(view_func, method):
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return view_func.__name__
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(method.lower(), method.lower())
+    return f'{view_class.__name__}.{action}'
+
+
+def bucket_index(duration):
+    for index, bound in enumerate(BUCKETS):
+        if duration <= bound:
+            return index
+    return len(BUCKETS)
+
+
+class Collector:
+    # Счётчики копятся в памяти процесса и раз в PERF_FLUSH_INTERVAL
+    # секунд сбрасываются в общий кэш, откуда их читает /metrics/.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = defaultdict(Counter)
+        self.flushed = time.monotonic()
+
+    def record(self, view, duration, metrics):
+        with self.lock:
+            counters = self.pending[view]
+            counters['requests'] += 1
+            counters['duration_us'] += int(duration * 1e6)
+            counters['sql_queries'] += metrics.sql_queries
+            counters['sql_us'] += int(metrics.sql_time * 1e6)
+            counters['serializer_us'] += int(metrics.serializer_time * 1e6)
+            counters[f'bucket_{bucket_index(duration)}'] += 1
+            if (
+                time.monotonic() - self.flushed
+                < settings.PERF_FLUSH_INTERVAL
+            ):
+                return
+        self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(Counter)
+            self.flushed = time.monotonic()
+        if not pending:
+            return
+        cache = caches[settings.PERF_CACHE_ALIAS]
+        views = set(cache.get(VIEWS_KEY) or ())
+        if not views >= pending.keys():
+            cache.set(VIEWS_KEY, sorted(views | pending.keys()), None)
+        for view, counters in pending.items():
+            for field, value in counters.items():
+                key = METRIC_KEY.format(view=view, field=field)
+                cache.add(key, 0, None)
+                try:
+                    cache.incr(key, value)
+                except ValueError:
+                    cache.set(key, value, None)
+
+    def snapshot(self):
+        self.flush()
+        cache = caches[settings.PERF_CACHE_ALIAS]
+        views = cache.get(VIEWS_KEY) or ()
+        keys = {
+            (view, field): METRIC_KEY.format(view=view, field=field)
+            for view in views for field in FIELDS
+        }
+        values = cache.get_many(keys.values())
+        return {
+            view: {
+                field: values.get(keys[(view, field)], 0) for field in FIELDS
+            }
+            for view in views
+        }
+
+
+collector = Collector()
+
+
+def render_view_metrics(lines, snapshot):
+    lines += [
+        '# HELP yamdb_request_duration_seconds Время обработки запроса.',
+        '# TYPE yamdb_request_duration_seconds histogram',
+    ]
+    for view, values in snapshot.items():
+        total = 0
+        for index, bound in enumerate(BUCKETS + ('+Inf',)):
+            total += values[f'bucket_{index}']
+            lines.append(
+                'yamdb_request_duration_seconds_bucket'
+                f'{{view="{view}",le="{bound}"}} {total}'
+            )
+        lines += [
+            f'yamdb_request_duration_seconds_sum{{view="{view}"}} '
+            f'{values["duration_us"] / 1e6}',
+            f'yamdb_request_duration_seconds_count{{view="{view}"}} '
+            f'{values["requests"]}',
+        ]
+    for name, field, scale, description in (
+        ('sql_queries_total', 'sql_queries', 1, 'SQL-запросы.'),
+        ('sql_seconds_total', 'sql_us', 1e6, 'Время SQL-запросов.'),
+        ('serializer_seconds_total', 'serializer_us', 1e6,
+         'Время сериализаторов.'),
+    ):
+        lines += [
+            f'# HELP yamdb_request_{name} {description}',
+            f'# TYPE yamdb_request_{name} counter',
+        ]
+        lines += [
+            f'yamdb_request_{name}{{view="{view}"}} {values[field] / scale}'
+            for view, values in snapshot.items()
+        ]
+
+
+def render_prometheus():
+    lines = [
+        '# HELP yamdb_metrics_sample_rate Доля запросов с замерами.',
+        '# TYPE yamdb_metrics_sample_rate gauge',
+        f'yamdb_metrics_sample_rate {settings.PERF_SAMPLE_RATE}',
+    ]
+    render_view_metrics(lines, collector.snapshot())
+    stats = cache_stats()
+    lines += [
+        '# HELP yamdb_api_cache_requests_total Обращения к кэшу ответов.',
+        '# TYPE yamdb_api_cache_requests_total counter',
+        f'yamdb_api_cache_requests_total{{result="hit"}} {stats["hits"]}',
+        f'yamdb_api_cache_requests_total{{result="miss"}} {stats["misses"]}',
+        '# HELP yamdb_email_queue_depth Письма, ожидающие отправки.',
+        '# TYPE yamdb_email_queue_depth gauge',
+        f'yamdb_email_queue_depth {outbox.queue_depth()}',
+    ]
+    with outbox.metrics_lock:
+        email = dict(outbox.metrics)
+    lines += [
+        '# HELP yamdb_email_sent_total Отправленные письма (процесс).',
+        '# TYPE yamdb_email_sent_total counter',
+        f'yamdb_email_sent_total {email["sent"]}',
+        '# HELP yamdb_email_failed_total Неудачные отправки (процесс).',
+        '# TYPE yamdb_email_failed_total counter',
+        f'yamdb_email_failed_total {email["failed"]}',
+        '# HELP yamdb_email_latency_seconds_sum Задержка от постановки в '
+        'очередь до отправки (процесс).',
+        '# TYPE yamdb_email_latency_seconds_sum counter',
+        f'yamdb_email_latency_seconds_sum {email["latency_seconds_sum"]}',
+    ]
+    return '\n'.join(lines) + '\n'
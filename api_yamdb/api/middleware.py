@@ -0,0 +1,73 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import (UNRESOLVED, RequestMetrics, collector, sql_wrapper,
+                      state, view_label)
+from .queries import QueryAudit
+
+SERVER_TIMING_HEADER = 'Server-Timing'
+
+logger = logging.getLogger('api.queries')
+
+
+class PerformanceMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.PERF_SAMPLE_RATE:
+            return self.get_response(request)
+        metrics = state.metrics = RequestMetrics()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            state.metrics = None
+        duration = time.perf_counter() - started
+        collector.record(
+            getattr(request, 'perf_view', UNRESOLVED), duration, metrics
+        )
+        if settings.PERF_SERVER_TIMING:
+            response[SERVER_TIMING_HEADER] = metrics.server_timing(duration)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.perf_view = view_label(view_func, request.method)
+
+
+class QueryAuditMiddleware:
+    # Только для разработки: запоминает стек каждого запроса к БД.
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        audit = QueryAudit()
+        with ExitStack() as stack:
+            # Выполнится последним, уже после снятия обёрток соединений.
+            stack.callback(self.report, request, audit)
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(audit))
+            return self.get_response(request)
+
+    def report(self, request, audit):
+        problems = audit.problems()
+        if problems:
+            logger.warning(
+                '%s %s: %s', request.method, request.path,
+                '\n'.join(problems)
+            )
@@ -0,0 +1,238 @@
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import ValidationError as BadRequest
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+INVALID_CURSOR = 'Некорректный курсор.'
+INVALID_PAGE = 'Некорректная страница.'
+CURSOR_ORDERING = (
+    'Курсорная пагинация сортирует только по {ordering}, '
+    'параметр нельзя использовать вместе с ней.'
+)
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder обрезает время до миллисекунд: строки с одной
+    # миллисекундой, но разными микросекундами пропали бы между страницами.
+
+    def default(self, value):
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        return super().default(value)
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+
+    def __init__(self, ordering, page_size):
+        self.ordering = ordering
+        self.page_size = page_size
+
+    def get_fields(self, queryset):
+        return [
+            (
+                queryset.model._meta.get_field(name.lstrip('-')),
+                name.startswith('-'),
+            ) for name in self.ordering
+        ]
+
+    def get_order_by(self, fields):
+        order_by = []
+        for field, descending in fields:
+            expression = F(field.attname)
+            if not field.null:
+                order_by.append(
+                    expression.desc() if descending else expression.asc()
+                )
+            elif descending:
+                order_by.append(expression.desc(nulls_first=True))
+            else:
+                order_by.append(expression.asc(nulls_last=True))
+        return order_by
+
+    def get_after_filter(self, fields, values):
+        after = Q()
+        equal = Q()
+        for (field, descending), value in zip(fields, values):
+            name = field.attname
+            if value is None:
+                if descending:
+                    after |= equal & Q(**{f'{name}__isnull': False})
+                equal &= Q(**{f'{name}__isnull': True})
+                continue
+            lookup = 'lt' if descending else 'gt'
+            strict = Q(**{f'{name}__{lookup}': value})
+            if field.null and not descending:
+                strict |= Q(**{f'{name}__isnull': True})
+            after |= equal & strict
+            equal &= Q(**{name: value})
+        return after
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii'))
+            )
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(INVALID_CURSOR)
+        if not isinstance(values, list) or len(values) != len(
+            self.ordering
+        ):
+            raise NotFound(INVALID_CURSOR)
+        return values
+
+    def encode_cursor(self, instance, fields):
+        values = [getattr(instance, field.attname) for field, _ in fields]
+        return base64.urlsafe_b64encode(
+            json.dumps(values, cls=CursorEncoder).encode('ascii')
+        ).decode('ascii')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        fields = self.get_fields(queryset)
+        queryset = queryset.order_by(*self.get_order_by(fields))
+        values = self.decode_cursor(request)
+        if values is not None:
+            try:
+                values = [
+                    None if value is None else field.to_python(value)
+                    for (field, _), value in zip(fields, values)
+                ]
+                queryset = queryset.filter(
+                    self.get_after_filter(fields, values)
+                )
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(INVALID_CURSOR)
+        page = list(queryset[:self.page_size + 1])
+        self.next_cursor = None
+        if len(page) > self.page_size:
+            page = page[:self.page_size]
+            self.next_cursor = self.encode_cursor(page[-1], fields)
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.next_cursor
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    mode_query_param = 'pagination'
+    keyset_mode = 'cursor'
+
+    def use_keyset(self, request, view):
+        return (
+            getattr(view, 'keyset_pagination', False)
+            or request.query_params.get(
+                self.mode_query_param
+            ) == self.keyset_mode
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if view is not None and self.use_keyset(request, view):
+            if api_settings.ORDERING_PARAM in request.query_params:
+                raise BadRequest({api_settings.ORDERING_PARAM: [
+                    CURSOR_ORDERING.format(
+                        ordering=', '.join(view.keyset_ordering)
+                    )
+                ]})
+            self.keyset = KeysetPagination(
+                view.keyset_ordering,
+                self.get_page_size(request)
+            )
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset is not None:
+            return None
+        return super().get_previous_link()
+
+
+class PositionPagination(PageNumberPagination):
+    # Страница выбирается диапазоном мест по индексу, без OFFSET и COUNT:
+    # размер таблицы отдаёт представление.
+
+    def get_page_number(self, request):
+        try:
+            number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound(INVALID_PAGE)
+        if number < 1:
+            raise NotFound(INVALID_PAGE)
+        return number
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.count = view.get_ranking_size()
+        self.number = self.get_page_number(request)
+        self.page_limit = self.get_page_size(request)
+        start = (self.number - 1) * self.page_limit
+        if start and start >= self.count:
+            raise NotFound(INVALID_PAGE)
+        return list(queryset.filter(
+            position__gt=start, position__lte=start + self.page_limit
+        ).order_by('position'))
+
+    def get_next_link(self):
+        if self.number * self.page_limit >= self.count:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param,
+            self.number + 1
+        )
+
+    def get_previous_link(self):
+        if self.number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.number - 1
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
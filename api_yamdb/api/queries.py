@@ -0,0 +1,107 @@
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from rest_framework.fields import Field
+
+NUMBER = re.compile(r'\b\d+(\.\d+)?\b')
+STRING = re.compile(r"'(?:[^']|'')*'")
+IN_LIST = re.compile(r'\bIN \((?:\s*(?:%s|\?)\s*,?)+\)', re.I)
+SPACES = re.compile(r'\s+')
+SERVICE_STATEMENTS = ('SAVEPOINT', 'RELEASE', 'ROLLBACK', 'BEGIN', 'COMMIT')
+# Обёртки замеров не считаются источником запроса.
+INSTRUMENTATION_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'metrics.py'),
+}
+
+
+def normalize(sql):
+    sql = STRING.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    sql = IN_LIST.sub('IN (...)', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+def serializer_field(frame):
+    owner = frame.f_locals.get('self')
+    parent = getattr(owner, 'parent', None)
+    if isinstance(owner, Field) and owner.field_name and parent is not None:
+        return f'{type(parent).__name__}.{owner.field_name}'
+    return None
+
+
+def code_location():
+    # Первый кадр стека из кода проекта и поле сериализатора, если запрос
+    # сделан при его отрисовке: так видно, откуда на самом деле пришёл SQL.
+    field = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        field = field or serializer_field(frame)
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if (
+            filename.startswith(settings.BASE_DIR)
+            and filename not in INSTRUMENTATION_FILES
+            and 'site-packages' not in filename
+        ):
+            relative = os.path.relpath(filename, settings.BASE_DIR)
+            location = f'{relative}:{frame.f_lineno} ({frame.f_code.co_name})'
+            return f'{location} [{field}]' if field else location
+        frame = frame.f_back
+    return field or 'unknown'
+
+
+class QueryAudit:
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                (sql, time.perf_counter() - started, code_location())
+            )
+
+    def groups(self):
+        groups = defaultdict(lambda: {
+            'count': 0, 'seconds': 0.0, 'locations': Counter()
+        })
+        for sql, duration, location in self.queries:
+            if sql.lstrip().upper().startswith(SERVICE_STATEMENTS):
+                continue
+            group = groups[normalize(sql)]
+            group['count'] += 1
+            group['seconds'] += duration
+            group['locations'][location] += 1
+        return groups
+
+    def problems(self, repeat_threshold=None, slow_ms=None):
+        repeat_threshold = (
+            repeat_threshold or settings.QUERY_AUDIT_REPEAT_THRESHOLD
+        )
+        slow_ms = slow_ms or settings.QUERY_AUDIT_SLOW_MS
+        problems = [
+            f'{group["count"]} повторов ({group["seconds"] * 1000:.1f} мс): '
+            f'{statement}\n    из {location_list(group["locations"])}'
+            for statement, group in self.groups().items()
+            if group['count'] >= repeat_threshold
+        ]
+        problems += [
+            f'медленный запрос ({duration * 1000:.1f} мс): {sql}\n'
+            f'    из {location}'
+            for sql, duration, location in self.queries
+            if duration * 1000 >= slow_ms
+        ]
+        return problems
+
+
+def location_list(locations):
+    return ', '.join(
+        f'{location} x{count}' for location, count in locations.most_common()
+    )
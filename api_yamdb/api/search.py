@@ -0,0 +1,83 @@
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            TrigramSimilarity)
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from reviews.models import Title
+
+from .cache import get_version
+
+TOKEN = re.compile(r'\w+')
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+MAX_FALLBACK_RESULTS = 1000
+
+
+def tokenize(text):
+    return TOKEN.findall((text or '').lower())
+
+
+# Индекс в памяти процесса для баз без полнотекстового поиска (SQLite).
+class TitleSearchIndex:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.tokens = {}
+
+    def build(self):
+        tokens = defaultdict(lambda: defaultdict(float))
+        for pk, name, description in Title.objects.values_list(
+            'pk', 'name', 'description'
+        ).iterator():
+            for token in tokenize(name):
+                tokens[token][pk] += NAME_WEIGHT
+            for token in tokenize(description):
+                tokens[token][pk] += DESCRIPTION_WEIGHT
+        return tokens
+
+    def get_tokens(self):
+        version = get_version('titles')
+        with self.lock:
+            if self.version != version:
+                self.tokens = self.build()
+                self.version = version
+            return self.tokens
+
+    def search(self, text):
+        tokens = self.get_tokens()
+        ranks = defaultdict(float)
+        for term in tokenize(text):
+            for token, postings in tokens.items():
+                if token.startswith(term):
+                    for pk, weight in postings.items():
+                        ranks[pk] += weight
+        return sorted(
+            ranks.items(), key=lambda item: (-item[1], item[0])
+        )[:MAX_FALLBACK_RESULTS]
+
+
+fallback_index = TitleSearchIndex()
+
+
+def search_titles(queryset, text):
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(text, config=settings.SEARCH_CONFIG)
+        return queryset.filter(
+            Q(search_vector=query) | Q(name__trigram_similar=text)
+        ).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+            + TrigramSimilarity('name', text)
+        )
+    ranks = fallback_index.search(text)
+    return queryset.filter(pk__in=[pk for pk, _ in ranks]).annotate(
+        search_rank=Case(
+            *[When(pk=pk, then=Value(rank)) for pk, rank in ranks],
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+    )
@@ -1,39 +1,39 @@
 from django.conf import settings
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from rest_framework.exceptions import ValidationError
 
-from reviews.models import Category, Comments, Genre, Review, Title, User
-from reviews.validations import validate_username
+from .metrics import TimedSerializerMixin
+from reviews.models import (MAX_SCORE, MIN_SCORE, Category, Comments, Genre,
+                            Review, Title, TitleRanking, TitleStats, User)
+from reviews.validations import validate_username, validate_year
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         fields = ('name', 'slug')
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         fields = ('name', 'slug')
         model = Genre
 
 
-class TitlesReadSerializer(serializers.ModelSerializer):
+class TitlesReadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
     rating = serializers.IntegerField()
 
     class Meta:
         fields = ('id', 'name', 'year', 'description',
-                  'genre', 'category', 'rating',)
+                  'genre', 'category', 'rating', 'review_count',)
         model = Title
         read_only_fields = fields
 
 
-class TitlesWriteSerializer(serializers.ModelSerializer):
+class TitlesWriteSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug',
@@ -50,35 +50,44 @@ class TitlesWriteSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleStatsSerializer(TimedSerializerMixin,
+                           serializers.ModelSerializer):
+    histogram = serializers.DictField(child=serializers.IntegerField())
+    median = serializers.FloatField()
+
+    class Meta:
+        fields = ('histogram', 'count', 'median', 'latest_pub_date')
+        model = TitleStats
+        read_only_fields = fields
+
+
+class TitleRankingSerializer(TimedSerializerMixin,
+                             serializers.ModelSerializer):
+    title = TitlesReadSerializer()
+
+    class Meta:
+        fields = ('position', 'score', 'title')
+        model = TitleRanking
+        read_only_fields = fields
+
+
+DUPLICATE_REVIEW = 'Вы не можете добавить более одного отзыва на произведение'
+
+
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
         default=serializers.CurrentUserDefault()
     )
 
-    def validate(self, data):
-        request = self.context['request']
-        if request.method != 'POST':
-            return data
-        title = get_object_or_404(
-            Title,
-            pk=self.context['view'].kwargs.get('title_id')
-        )
-        if Review.objects.filter(
-            title=title,
-            author=request.user
-        ).exists():
-            raise ValidationError('Вы не можете добавить более'
-                                  'одного отзыва на произведение')
-        return data
-
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comment_count')
         model = Review
 
 
-class CommentsSerializer(serializers.ModelSerializer):
+class CommentsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
@@ -90,7 +99,32 @@ class CommentsSerializer(serializers.ModelSerializer):
         model = Comments
 
 
-class UserSerializer(serializers.ModelSerializer):
+class BulkReviewSerializer(serializers.Serializer):
+    title = serializers.IntegerField()
+    author = serializers.CharField(max_length=settings.MAX_LENGTH_USERNAME)
+    text = serializers.CharField()
+    score = serializers.IntegerField(
+        min_value=MIN_SCORE, max_value=MAX_SCORE
+    )
+
+
+class BulkCommentSerializer(serializers.Serializer):
+    review = serializers.IntegerField()
+    author = serializers.CharField(max_length=settings.MAX_LENGTH_USERNAME)
+    text = serializers.CharField()
+
+
+class BulkTitleSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    year = serializers.IntegerField(validators=[validate_year])
+    description = serializers.CharField()
+    category = serializers.SlugField(max_length=settings.MAX_LENGTH_SLUG)
+    genre = serializers.ListField(
+        child=serializers.SlugField(max_length=settings.MAX_LENGTH_SLUG)
+    )
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = User
@@ -0,0 +1,74 @@
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.aggregates import ratings_changed
+from reviews.models import Category, Genre, Title, User
+
+from .authentication import IGNORED_FIELDS, mark_user_changed
+from .cache import invalidate
+
+NAMESPACES = {
+    Category: 'categories',
+    Genre: 'genres',
+    Title: 'titles',
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_catalog(sender, **kwargs):
+    if sender in NAMESPACES:
+        transaction.on_commit(partial(invalidate, NAMESPACES[sender]))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith('post_'):
+        transaction.on_commit(partial(invalidate, 'titles'))
+
+
+@receiver(ratings_changed)
+def invalidate_ratings(sender, **kwargs):
+    transaction.on_commit(partial(invalidate, 'titles'))
+
+
+@receiver(post_save, sender=User)
+def revoke_claims_on_save(sender, instance, created, update_fields,
+                          **kwargs):
+    if created or (update_fields and set(update_fields) <= IGNORED_FIELDS):
+        return
+    mark_user_changed(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_claims_on_delete(sender, instance, **kwargs):
+    mark_user_changed(instance.pk)
+
+
+@receiver(request_started)
+def close_unusable_connections(sender, **kwargs):
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    # Проверяются только соединения, простоявшие дольше порога: запросу
+    # сразу после предыдущего (попадание в кэш, 304) SELECT 1 не нужен.
+    now = time.monotonic()
+    for connection in connections.all():
+        if (
+            connection.connection is not None
+            and now - getattr(connection, 'request_finished_at', now)
+            >= settings.DB_CONN_HEALTH_CHECK_IDLE
+            and not connection.is_usable()
+        ):
+            connection.close()
+
+
+@receiver(request_finished)
+def mark_connections_idle(sender, **kwargs):
+    now = time.monotonic()
+    for connection in connections.all():
+        connection.request_finished_at = now
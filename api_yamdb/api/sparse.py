@@ -0,0 +1,81 @@
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+UNKNOWN_FIELDS = 'Неизвестные поля: {names}'
+
+
+class SparseFieldsMixin:
+    # ?fields= оставляет в ответе только перечисленные поля, ?omit= убирает
+    # перечисленные. Запрос к БД сужается так же: only() по sparse_columns
+    # (по умолчанию поле модели с тем же именем) и sparse_required, связи
+    # из sparse_select_related и sparse_prefetch_related - только нужные.
+    sparse_required = ()
+    sparse_columns = {}
+    sparse_select_related = {}
+    sparse_prefetch_related = {}
+
+    def parse_field_names(self, param, available):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        names = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = names - set(available)
+        if unknown:
+            raise ValidationError({param: [
+                UNKNOWN_FIELDS.format(names=', '.join(sorted(unknown)))
+            ]})
+        return names
+
+    def get_sparse_fields(self):
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+        self._sparse_fields = None
+        if self.request.method not in permissions.SAFE_METHODS:
+            return None
+        available = self.get_serializer_class().Meta.fields
+        selected = self.parse_field_names(FIELDS_PARAM, available)
+        omitted = self.parse_field_names(OMIT_PARAM, available)
+        if selected is None and omitted is None:
+            return None
+        self._sparse_fields = (
+            (selected if selected is not None else set(available))
+            - (omitted or set())
+        )
+        return self._sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            declared = getattr(serializer, 'child', serializer).fields
+            for name in set(declared) - fields:
+                declared.pop(name)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        # Поля курсора читаются из объектов страницы.
+        columns = {'pk', *self.sparse_required} | {
+            name.lstrip('-') for name in getattr(self, 'keyset_ordering', ())
+        }
+        for field in fields:
+            columns.update(self.sparse_columns.get(field, (field,)))
+        queryset = queryset.select_related(None).prefetch_related(None).only(
+            *sorted(columns)
+        )
+        # select_related() без аргументов подтянул бы все связи.
+        select_related = [
+            related for field, related in self.sparse_select_related.items()
+            if field in fields
+        ]
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        return queryset.prefetch_related(*(
+            related for field, related in self.sparse_prefetch_related.items()
+            if field in fields
+        ))
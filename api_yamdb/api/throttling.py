@@ -0,0 +1,140 @@
+import threading
+import time
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import SimpleRateThrottle
+
+COUNTER_KEY = 'throttle:{key}:{window}'
+
+
+class LocalCounterStore:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    def incr(self, key, timeout):
+        now = time.monotonic()
+        with self.lock:
+            value, expires = self.counters.get(key, (0, now + timeout))
+            if expires <= now:
+                value, expires = 0, now + timeout
+            self.counters[key] = (value + 1, expires)
+            if len(self.counters) > settings.THROTTLE_LOCAL_MAX_KEYS:
+                self.counters = {
+                    counter_key: counter
+                    for counter_key, counter in self.counters.items()
+                    if counter[1] > now
+                }
+            return value + 1
+
+    def get(self, key):
+        with self.lock:
+            value, expires = self.counters.get(key, (0, 0))
+            return value if expires > time.monotonic() else 0
+
+
+class CacheCounterStore:
+
+    def __init__(self):
+        self.cache = caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def incr(self, key, timeout):
+        self.cache.add(key, 0, timeout)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, 1, timeout)
+            return 1
+
+    def get(self, key):
+        return self.cache.get(key, 0)
+
+
+stores = {}
+store_lock = threading.Lock()
+
+
+def get_store():
+    path = settings.THROTTLE_COUNTER_STORE
+    with store_lock:
+        if path not in stores:
+            stores[path] = import_string(path)()
+        return stores[path]
+
+
+class BucketThrottle(SimpleRateThrottle):
+    # Скользящее окно из двух счётчиков: текущего и предыдущего периода.
+    # Предыдущий учитывается пропорционально оставшейся доле окна, поэтому
+    # лимит пополняется плавно, как ведро токенов, а проверка стоит
+    # один incr и один get в хранилище счётчиков.
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        now = self.timer()
+        window, elapsed = divmod(now, self.duration)
+        counters = get_store()
+        current = counters.incr(
+            COUNTER_KEY.format(key=key, window=int(window)),
+            self.duration * 2
+        )
+        previous = counters.get(
+            COUNTER_KEY.format(key=key, window=int(window) - 1)
+        )
+        self.remaining = self.duration - elapsed
+        return (
+            current + previous * (self.remaining / self.duration)
+            <= self.num_requests
+        )
+
+    def wait(self):
+        return self.remaining
+
+
+class AuthIPThrottle(BucketThrottle):
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class AuthUsernameThrottle(BucketThrottle):
+    scope = 'auth_username'
+
+    def get_cache_key(self, request, view):
+        # Тело может быть списком или строкой: тогда считаем по адресу,
+        # а ошибку вернёт сериализатор.
+        if not isinstance(request.data, Mapping):
+            return self.cache_format % {
+                'scope': self.scope,
+                'ident': self.get_ident(request),
+            }
+        username = request.data.get('username')
+        if not username:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': str(username).lower(),
+        }
+
+
+class FeedbackCreateThrottle(BucketThrottle):
+    scope = 'feedback'
+
+    def get_cache_key(self, request, view):
+        if request.method != 'POST' or not request.user.is_authenticated:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': request.user.pk,
+        }
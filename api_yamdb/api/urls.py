@@ -2,8 +2,11 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (CategoryViewSet, JwtTokenAPIView, GenreViewSet,
-                    TitlesViewSet, RegistrationAPIView, ReviewViewSet,
-                    CommentsViewSet, UserViewSet)
+                    TitlesViewSet, LeaderboardViewSet,
+                    RegistrationAPIView, ReviewViewSet,
+                    CommentsViewSet, UserViewSet, ExportAPIView,
+                    BulkReviewAPIView, BulkCommentAPIView,
+                    BulkTitleAPIView, prometheus_metrics)
 
 
 app_name = 'api'
@@ -24,6 +27,11 @@ router_v1.register(
     TitlesViewSet,
     basename='titles'
 )
+router_v1.register(
+    r'leaderboards/(?P<kind>top|trending)',
+    LeaderboardViewSet,
+    basename='leaderboards'
+)
 router_v1.register(
     r'titles/(?P<title_id>\d+)/reviews',
     ReviewViewSet,
@@ -46,7 +54,24 @@ authorization_urls = [
 ]
 
 
+export_urls = [
+    path('export/<slug:dataset>/', ExportAPIView.as_view(), name='export'),
+]
+
+
+bulk_urls = [
+    path('titles/bulk/', BulkTitleAPIView.as_view(), name='bulk-titles'),
+    path('reviews/bulk/', BulkReviewAPIView.as_view(), name='bulk-reviews'),
+    path(
+        'comments/bulk/', BulkCommentAPIView.as_view(), name='bulk-comments'
+    ),
+]
+
+
 urlpatterns = [
+    path('v1/metrics/', prometheus_metrics, name='metrics'),
+    path('v1/', include(bulk_urls)),
     path('v1/', include(router_v1.urls)),
     path('v1/', include(authorization_urls)),
+    path('v1/', include(export_urls)),
 ]
@@ -1,41 +1,76 @@
-import random
+import hmac
+from collections import Counter
 
 from django.conf import settings
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 
-from .filters import TitlesFilter
+from .authentication import load_user, token_for_user
+from .bulk import (
+    CREATED,
+    ERROR,
+    create_comments,
+    create_reviews,
+    get_chunk_size,
+    upsert_titles
+)
+from .cache import CachedDetailMixin, CachedResponseMixin, get_version
+from .conditional import ConditionalGetMixin
+from .confirmation import check_code, issue_code
+from .filters import TitlesFilter, TitlesOrderingFilter
+from .metrics import render_prometheus
+from .pagination import PageNumberOrKeysetPagination, PositionPagination
 from .permissions import (
     IsAdmin,
     IsModerator,
     IsOwner,
     IsReadOnly
 )
+from .throttling import (
+    AuthIPThrottle,
+    AuthUsernameThrottle,
+    FeedbackCreateThrottle
+)
 from .serializers import (
+    DUPLICATE_REVIEW,
     CategorySerializer,
     CommentsSerializer,
     GenreSerializer,
     RegistrationSerializer,
     ReviewSerializer,
     TitlesReadSerializer,
+    TitleRankingSerializer,
+    TitleStatsSerializer,
     TitlesWriteSerializer,
     TokenSerializer,
     UserEditSerializer,
     UserSerializer
 )
-from reviews.models import Category, Genre, Review, Title, User
+from .sparse import SparseFieldsMixin
+from reviews.export import (
+    CONTENT_TYPES,
+    DATASETS,
+    FORMATS,
+    export_lines,
+    parse_since
+)
+from reviews.leaderboards import SCOPE_FIELDS, scope_key
+from reviews.models import (Category, Genre, Leaderboard, Review, Title,
+                            TitleRanking, TitleStats, User)
+from reviews.outbox import enqueue
 
 
 class DescriptionViewSet(
+    CachedResponseMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -49,22 +84,35 @@ class DescriptionViewSet(
 
 
 class CategoryViewSet(DescriptionViewSet):
+    cache_namespace = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
 
 class GenreViewSet(DescriptionViewSet):
+    cache_namespace = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
 
 
-class TitlesViewSet(viewsets.ModelViewSet):
+class TitlesViewSet(ConditionalGetMixin, CachedDetailMixin,
+                    SparseFieldsMixin, viewsets.ModelViewSet):
     permission_classes = [IsAdmin | IsReadOnly]
-    queryset = Title.objects.annotate(rating=Avg('reviews__score')).all()
-    pagination_class = PageNumberPagination
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    cache_namespace = 'titles'
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').defer('search_vector')
+    sparse_columns = {
+        'genre': (),
+        'category': ('category', 'category__name', 'category__slug'),
+    }
+    sparse_select_related = {'category': 'category'}
+    sparse_prefetch_related = {'genre': 'genre'}
+    pagination_class = PageNumberOrKeysetPagination
+    keyset_ordering = ('-year', '-id')
+    filter_backends = [DjangoFilterBackend, TitlesOrderingFilter]
     filterset_class = TitlesFilter
-    ordering_fields = ('year',)
+    ordering_fields = ('year', 'rating')
     ordering = ('-year',)
 
     def get_serializer_class(self):
@@ -72,40 +120,179 @@ class TitlesViewSet(viewsets.ModelViewSet):
             return TitlesReadSerializer
         return TitlesWriteSerializer
 
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        return self.conditional_response(self.get_stats, request, pk=pk)
+
+    def get_stats(self, request, pk):
+        pk = self.get_title_pk()
+        stats = TitleStats.objects.filter(title_id=pk).first()
+        if stats is None:
+            stats = TitleStats(title=get_object_or_404(Title, pk=pk))
+        return Response(TitleStatsSerializer(stats).data)
+
+    def get_title_pk(self):
+        try:
+            return int(self.kwargs['pk'])
+        except ValueError:
+            raise Http404
+
+    def get_conditional_state(self, request):
+        if self.action == 'list':
+            version = get_version(self.cache_namespace)
+            return f'titles:{version}', version / 1000
+        title = Title.objects.filter(
+            pk=self.get_title_pk()
+        ).values('version', 'modified').first()
+        if title is None:
+            return None
+        descriptions = [get_version('categories'), get_version('genres')]
+        return (
+            f'title:{title["version"]}:{descriptions}',
+            max(
+                title['modified'].timestamp(),
+                *(version / 1000 for version in descriptions)
+            )
+        )
+
+
+class LeaderboardViewSet(ConditionalGetMixin, mixins.ListModelMixin,
+                         viewsets.GenericViewSet):
+    permission_classes = [IsReadOnly]
+    serializer_class = TitleRankingSerializer
+    pagination_class = PositionPagination
+
+    def get_scope(self):
+        lookups = [
+            (field, self.request.query_params[field])
+            for field in SCOPE_FIELDS if field in self.request.query_params
+        ]
+        if not lookups:
+            return Leaderboard.GLOBAL_SCOPE
+        if len(lookups) > 1:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Укажите только жанр или только категорию.'
+            ]})
+        field, slug = lookups[0]
+        return scope_key(field, get_object_or_404(
+            SCOPE_FIELDS[field].objects.only('pk'), slug=slug
+        ).pk)
+
+    def get_leaderboard(self):
+        if not hasattr(self, '_leaderboard'):
+            self._leaderboard = Leaderboard.objects.filter(
+                kind=self.kwargs['kind'], scope=self.get_scope()
+            ).first()
+        return self._leaderboard
+
+    def get_ranking_size(self):
+        leaderboard = self.get_leaderboard()
+        return leaderboard.size if leaderboard else 0
+
+    def get_queryset(self):
+        return TitleRanking.objects.filter(
+            leaderboard=self.get_leaderboard()
+        ).select_related('title__category').prefetch_related(
+            'title__genre'
+        ).defer('title__search_vector')
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_conditional_state(self, request):
+        leaderboard = self.get_leaderboard()
+        if leaderboard is None:
+            return None
+        refreshed = leaderboard.refreshed.timestamp()
+        version = get_version('titles')
+        return (
+            f'leaderboard:{leaderboard.pk}:{refreshed}:{version}',
+            max(refreshed, version / 1000)
+        )
+
+
+class ReviewViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                    viewsets.ModelViewSet):
     permission_classes = [(IsOwner & permissions.IsAuthenticated)
                           | IsAdmin | IsModerator | IsReadOnly]
     serializer_class = ReviewSerializer
+    throttle_classes = [FeedbackCreateThrottle]
+    pagination_class = PageNumberOrKeysetPagination
+    keyset_ordering = ('-pub_date', '-id')
+    # Связь с родителем читается менеджером, автор - IsOwner.
+    sparse_required = ('title', 'author')
+    sparse_columns = {'author': ('author', 'author__username')}
+    sparse_select_related = {'author': 'author'}
 
     def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author')
 
+    def get_conditional_state(self, request):
+        title = self.get_title()
+        return f'reviews:{title.version}', title.modified.timestamp()
+
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save(
-            author=self.request.user,
-            title=self.get_title()
-        )
+        try:
+            with transaction.atomic():
+                serializer.save(
+                    author=self.request.user,
+                    title=self.get_title()
+                )
+        except IntegrityError:
+            # Дубликатом считаем только нарушение unique_review: остальные
+            # ошибки (например, произведение удалили параллельно) - дальше.
+            if not Review.objects.filter(
+                title=self.get_title(), author=self.request.user
+            ).exists():
+                raise
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW]}
+            )
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                      viewsets.ModelViewSet):
     permission_classes = [(IsOwner & permissions.IsAuthenticated)
                           | IsAdmin | IsModerator | IsReadOnly]
     serializer_class = CommentsSerializer
+    throttle_classes = [FeedbackCreateThrottle]
+    pagination_class = PageNumberOrKeysetPagination
+    keyset_ordering = ('-pub_date', '-id')
+    # Связь с родителем читается менеджером, автор - IsOwner.
+    sparse_required = ('review', 'author')
+    sparse_columns = {'author': ('author', 'author__username')}
+    sparse_select_related = {'author': 'author'}
 
     def get_review(self):
-        return get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title__id=self.kwargs['title_id']
-        )
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                pk=self.kwargs.get('review_id'),
+                title__id=self.kwargs['title_id']
+            )
+        return self._review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
 
+    def get_conditional_state(self, request):
+        title = self.get_review().title
+        return f'comments:{title.version}', title.modified.timestamp()
+
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(
             author=self.request.user,
@@ -128,13 +315,14 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer_class=UserEditSerializer,
     )
     def users_me_profile(self, request):
+        user = load_user(request.user)
         if request.method == 'GET':
             return Response(
-                self.get_serializer(request.user).data,
+                self.get_serializer(user).data,
                 status=status.HTTP_200_OK
             )
         serializer = self.get_serializer(
-            request.user,
+            user,
             data=request.data,
             partial=True
         )
@@ -145,16 +333,23 @@ class UserViewSet(viewsets.ModelViewSet):
 
 class RegistrationAPIView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [AuthIPThrottle, AuthUsernameThrottle]
 
     def post(self, request, format=None):
         serializer = RegistrationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        confirmation_code = ''.join(random.sample(
-            settings.REGULAR_CONFIRMATION_CODE,
-            settings.MAX_LENGTH_CONFIRMATION_CODE
-        ))
         try:
-            user, _ = User.objects.get_or_create(**serializer.validated_data)
+            with transaction.atomic():
+                user, _ = User.objects.get_or_create(
+                    **serializer.validated_data
+                )
+                confirmation_code = issue_code(user)
+                enqueue(
+                    subject='Регистрация пользователя',
+                    message=f'Код подтверждения: {confirmation_code}',
+                    recipient_list=[user.email],
+                    from_email=settings.EMAIL_HOST_USER,
+                )
         except IntegrityError as error:
             for message in error.args:
                 if 'username' in message:
@@ -169,19 +364,12 @@ class RegistrationAPIView(APIView):
                                   ' уже существует.'},
                         status=status.HTTP_400_BAD_REQUEST
                     )
-        user.confirmation_code = confirmation_code
-        user.save()
-        send_mail(
-            subject='Регистрация пользователя',
-            message=f'Код подтверждения: {confirmation_code}',
-            from_email=settings.EMAIL_HOST_USER,
-            recipient_list=[request.data['email']],
-        )
         return Response(request.data, status=status.HTTP_200_OK)
 
 
 class JwtTokenAPIView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [AuthIPThrottle, AuthUsernameThrottle]
 
     def post(self, request, format=None):
         serializer = TokenSerializer(data=request.data)
@@ -190,19 +378,99 @@ class JwtTokenAPIView(APIView):
             User,
             username=serializer.validated_data['username']
         )
-        if user.confirmation_code != settings.DEFAULT_CONFIRMATION_CODE:
-            if user.confirmation_code == serializer.validated_data[
-                'confirmation_code'
-            ]:
-                access_token = RefreshToken.for_user(user).access_token
-                return Response(
-                    {'token': str(access_token)},
-                    status=status.HTTP_200_OK,
-                )
-            user.confirmation_code = settings.DEFAULT_CONFIRMATION_CODE
-            user.save()
+        if check_code(user, serializer.validated_data['confirmation_code']):
+            access_token = token_for_user(user)
+            return Response(
+                {'token': str(access_token)},
+                status=status.HTTP_200_OK,
+            )
         return Response(
             {'confirmation_code': 'Неверный код подтверждения'
                                   ', получите новый.'},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+class ExportAPIView(APIView):
+    permission_classes = [IsAdmin]
+
+    def get(self, request, dataset, format=None):
+        if dataset not in DATASETS:
+            raise NotFound(f'Неизвестный набор данных: {dataset}')
+        output_format = request.query_params.get('output', 'csv')
+        if output_format not in FORMATS:
+            raise ValidationError(
+                {'output': f'Допустимые форматы: {", ".join(FORMATS)}'}
+            )
+        try:
+            since = parse_since(request.query_params.get('since'))
+        except ValueError as error:
+            raise ValidationError({'since': str(error)})
+        response = StreamingHttpResponse(
+            export_lines(dataset, output_format, since),
+            content_type=CONTENT_TYPES[output_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{dataset}.{output_format}"'
+        )
+        return response
+
+
+class BulkCreateAPIView(APIView):
+    permission_classes = [IsAdmin]
+    create_items = None
+
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ['Ожидается список.']}
+            )
+        if not items:
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ['Список пуст.']}
+            )
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f'Не больше {settings.BULK_MAX_ITEMS} элементов за запрос.'
+            ]})
+        results = self.create_items(
+            items, get_chunk_size(request, len(items))
+        )
+        counts = Counter(result['status'] for result in results)
+        failed = counts.pop(ERROR, 0)
+        if counts[CREATED]:
+            response_status = status.HTTP_201_CREATED
+        elif counts:
+            response_status = status.HTTP_200_OK
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {CREATED: 0, **counts, 'failed': failed, 'results': results},
+            status=response_status
+        )
+
+
+class BulkReviewAPIView(BulkCreateAPIView):
+    create_items = staticmethod(create_reviews)
+
+
+class BulkCommentAPIView(BulkCreateAPIView):
+    create_items = staticmethod(create_comments)
+
+
+class BulkTitleAPIView(BulkCreateAPIView):
+    create_items = staticmethod(upsert_titles)
+
+
+def prometheus_metrics(request):
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+    if not hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    ):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(
+        render_prometheus(), content_type='text/plain; version=0.0.4'
+    )
@@ -3,14 +3,153 @@ ASGI config for YaMDb project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
+Django 2.2 has no ASGI handler and its ORM is synchronous, so requests are
+read and written by the event loop of the ASGI server (uvicorn) while the
+WSGI application runs in bounded thread pools. Responses of the hot read
+endpoints are fully rendered in the pool and sent from the event loop, so
+a slow client never holds a thread or a database connection.
 """
 
+import asyncio
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
 
-from django.core.asgi import get_asgi_application
+from asgiref.sync import AsyncToSync
+from asgiref.wsgi import WsgiToAsgiInstance
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+wsgi_application = get_wsgi_application()
+
+HOT_READ_PATHS = re.compile(
+    r'^/api/v1/titles/(\d+/)?$'
+    r'|^/api/v1/titles/\d+/reviews/$'
+    r'|^/api/v1/titles/\d+/reviews/\d+/comments/$'
+)
+READ_METHODS = ('GET', 'HEAD')
+MAX_MEMORY_BODY = 64 * 1024
+
+
+def close(response):
+    if hasattr(response, 'close'):
+        response.close()
+
+
+class OffloadedInstance(WsgiToAsgiInstance):
+
+    def __init__(self, wsgi_application, executor, buffered):
+        super().__init__(wsgi_application)
+        self.executor = executor
+        self.buffered = buffered
+
+    async def __call__(self, scope, receive, send):
+        self.scope = scope
+        with SpooledTemporaryFile(max_size=MAX_MEMORY_BODY) as body:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                body.write(message.get('body', b''))
+                if not message.get('more_body'):
+                    break
+            body.seek(0)
+            loop = asyncio.get_running_loop()
+            if not self.buffered:
+                self.sync_send = AsyncToSync(send)
+                await loop.run_in_executor(
+                    self.executor, self.run_streaming, body
+                )
+                return
+            messages = await loop.run_in_executor(
+                self.executor, self.run_buffered, body
+            )
+        for message in messages:
+            await send(message)
+
+    def run_buffered(self, body):
+        response = self.wsgi_application(
+            self.build_environ(self.scope, body), self.start_response
+        )
+        try:
+            content = b''.join(response)
+        finally:
+            # request_finished: Django возвращает соединение с БД.
+            close(response)
+        return [
+            self.response_start,
+            {'type': 'http.response.body', 'body': content},
+        ]
+
+    def run_streaming(self, body):
+        response = self.wsgi_application(
+            self.build_environ(self.scope, body), self.start_response
+        )
+        try:
+            for chunk in response:
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                self.sync_send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True,
+                })
+        finally:
+            close(response)
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({'type': 'http.response.body'})
+
+
+class Application:
+
+    def __init__(self, wsgi_application):
+        self.wsgi_application = wsgi_application
+        self.read_executor = ThreadPoolExecutor(
+            max_workers=settings.ASGI_READ_THREADS,
+            thread_name_prefix='asgi-read'
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.ASGI_THREADS,
+            thread_name_prefix='asgi'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(
+                f'Неподдерживаемый тип соединения: {scope["type"]}'
+            )
+        if (
+            scope['method'] in READ_METHODS
+            and HOT_READ_PATHS.match(scope['path'])
+        ):
+            instance = OffloadedInstance(
+                self.wsgi_application, self.read_executor, buffered=True
+            )
+        else:
+            instance = OffloadedInstance(
+                self.wsgi_application, self.executor, buffered=False
+            )
+        await instance(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.read_executor.shutdown(wait=True)
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+application = Application(wsgi_application)
@@ -30,13 +30,16 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_filters',
     'rest_framework',
-    'reviews',
-    'api',
+    'reviews.apps.ReviewsConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.PerformanceMiddleware',
+    'api.middleware.QueryAuditMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -77,10 +80,62 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        # Соединение переиспользуется между запросами потока, пока не
+        # истечёт CONN_MAX_AGE секунд (0 - закрывать после каждого запроса).
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
     }
 }
 
+# ASGI (api_yamdb.asgi, воркер uvicorn): пул потоков для горячих GET
+# (списки и карточки произведений, отзывы, комментарии) и пул для остальных
+# запросов. Каждый поток держит своё соединение с БД.
+ASGI_READ_THREADS = int(os.getenv('ASGI_READ_THREADS', default=16))
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', default=4))
+
+# Перед запросом проверять, что сохранённое соединение живо (SELECT 1),
+# чтобы перезапуск базы не давал ошибок на первых запросах воркеров.
+# Проверяются только соединения, простаивавшие не меньше
+# DB_CONN_HEALTH_CHECK_IDLE секунд.
+DB_CONN_HEALTH_CHECKS = os.getenv(
+    'DB_CONN_HEALTH_CHECKS', default='True'
+) == 'True'
+DB_CONN_HEALTH_CHECK_IDLE = int(
+    os.getenv('DB_CONN_HEALTH_CHECK_IDLE', default=30)
+)
+
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+
+# У LocMemCache в каждом процессе своя копия, DummyCache ничего не хранит:
+# записи в них не видны другим воркерам gunicorn.
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 60
+API_CACHE_TIMEOUTS = {
+    'categories': 60 * 10,
+    'genres': 60 * 10,
+    'titles': 60,
+}
+
+# Как часто процесс добавляет свои попадания и промахи кэша ответов к
+# общим счётчикам (api_cache_stats, /api/v1/metrics/).
+API_CACHE_STATS_INTERVAL = 10
+
 
 # Password validation
 
@@ -130,17 +185,49 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 100
+    'PAGE_SIZE': 100,
+    # Перед gunicorn стоит один nginx: адрес клиента - последний
+    # в X-Forwarded-For, подделать его заголовком запроса нельзя.
+    'NUM_PROXIES': 1,
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '20/min',
+        'auth_username': '5/min',
+        'feedback': '30/min',
+    },
 }
 
+# api.throttling.LocalCounterStore - счётчики в памяти процесса (тесты),
+# api.throttling.CacheCounterStore - счётчики в кэше THROTTLE_CACHE_ALIAS.
+# Общими для нескольких воркеров они будут, только если этот кэш общий
+# (CACHE_BACKEND - memcached, см. infra/docker-compose.yaml): с
+# LocMemCache по умолчанию у каждого воркера свои счётчики.
+THROTTLE_COUNTER_STORE = os.getenv(
+    'THROTTLE_COUNTER_STORE', default='api.throttling.CacheCounterStore'
+)
+THROTTLE_CACHE_ALIAS = 'default'
+THROTTLE_LOCAL_MAX_KEYS = 100000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Сколько помнить об изменении роли/удалении пользователя: токены, выданные
+# до изменения, всё это время проверяются по БД. Меньше срока жизни токена
+# ставить нельзя, иначе старые claims снова начнут приниматься.
+JWT_CHANGED_USERS_TTL = int(
+    SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds()
+)
+# Пользователь берётся из claims токена без запроса к БД, только если
+# отметки об изменении пользователей видны всем воркерам, то есть кэш
+# API_CACHE_ALIAS общий (memcached). Иначе пользователь читается из БД.
+JWT_TRUST_CLAIMS = (
+    CACHES[API_CACHE_ALIAS]['BACKEND'] not in LOCAL_CACHE_BACKENDS
+)
+
 AUTH_USER_MODEL = 'reviews.User'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
@@ -148,6 +235,19 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 EMAIL_HOST_USER = 'sender@gmail.com'
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Письма складываются в таблицу OutgoingEmail и отправляются пачками:
+# фоновым потоком веб-процесса и/или командой send_emails. Пачка
+# захватывается на EMAIL_OUTBOX_CLAIM_TIMEOUT секунд и отправляется вне
+# транзакции; если отправитель упал, письма вернутся в очередь.
+EMAIL_OUTBOX_IN_PROCESS = os.getenv(
+    'EMAIL_OUTBOX_IN_PROCESS', default='True'
+) == 'True'
+EMAIL_OUTBOX_THREADS = 1
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
+
 REGULAR_USERNAME = r'^[\w\d.@+-_]+\Z'
 REGULAR_CONFIRMATION_CODE = string.ascii_letters + string.digits
 MAX_LENGTH_NAME_DESCRIPTION = 256
@@ -156,3 +256,52 @@ MAX_LENGTH_EMAIL = 254
 MAX_LENGTH_CONFIRMATION_CODE = 10
 MAX_LENGTH_SLUG = 50
 DEFAULT_CONFIRMATION_CODE = '###'
+
+# stored - код хранится в User.confirmation_code;
+# signed - код вычисляется HMAC от id и почты пользователя и номера выдачи
+# и не пишется в БД; номер выдачи и использованные коды хранятся в кэше
+# (для нескольких воркеров нужен общий кэш, см. CACHE_BACKEND).
+CONFIRMATION_CODE_MODE = os.getenv('CONFIRMATION_CODE_MODE', default='stored')
+CONFIRMATION_CODE_TTL = 60 * 60
+# Первый секрет подписывает новые коды, остальные принимаются при ротации.
+CONFIRMATION_CODE_SECRETS = os.getenv(
+    'CONFIRMATION_CODE_SECRETS', default=SECRET_KEY
+).split(',')
+
+SEARCH_CONFIG = 'russian'
+
+# Замеры запросов (api.middleware.PerformanceMiddleware): доля запросов
+# с замерами, заголовок Server-Timing в ответе, период сброса счётчиков
+# процесса в общий кэш. /api/v1/metrics/ отдаёт их в формате Prometheus
+# по заголовку Authorization: Bearer <METRICS_TOKEN>; без токена закрыт.
+# Server-Timing раскрывает число SQL-запросов и время их выполнения,
+# поэтому по умолчанию включён только при DEBUG.
+PERF_SAMPLE_RATE = float(os.getenv('PERF_SAMPLE_RATE', default=0.1))
+PERF_SERVER_TIMING = os.getenv(
+    'PERF_SERVER_TIMING', default=str(DEBUG)
+) == 'True'
+PERF_FLUSH_INTERVAL = 10
+PERF_CACHE_ALIAS = 'default'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+
+# Поиск N+1 и медленных запросов (только при DEBUG и в тестах, см.
+# tests/plugins/query_audit.py): одинаковый по форме SQL, выполненный
+# в одном запросе не меньше QUERY_AUDIT_REPEAT_THRESHOLD раз, и SQL дольше
+# QUERY_AUDIT_SLOW_MS миллисекунд.
+QUERY_AUDIT_REPEAT_THRESHOLD = 5
+QUERY_AUDIT_SLOW_MS = 100
+
+# Массовое создание отзывов, комментариев и произведений: не больше
+# BULK_MAX_ITEMS элементов за запрос; ?chunk_size= делит их на отдельные
+# транзакции, BULK_BATCH_SIZE - строк в одном INSERT/UPDATE.
+BULK_MAX_ITEMS = 10000
+BULK_BATCH_SIZE = 1000
+
+# Рейтинги произведений (reviews.leaderboards, команда refresh_leaderboards):
+# по LEADERBOARD_SIZE мест в каждой таблице. Байесовский рейтинг тянет
+# среднюю оценку произведения к средней по всем отзывам с весом
+# LEADERBOARD_PRIOR_REVIEWS отзывов; популярность - отзывов в день за
+# последние LEADERBOARD_TRENDING_DAYS дней.
+LEADERBOARD_SIZE = 1000
+LEADERBOARD_PRIOR_REVIEWS = 10
+LEADERBOARD_TRENDING_DAYS = 7
@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+
+
+def cpu_count():
+    # В контейнере доступно столько ядер, сколько разрешает cpuset.
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+bind = os.getenv('GUNICORN_BIND', default='0:8000')
+
+# sync - один запрос на процесс; gthread - потоки внутри процесса, запросы
+# в основном ждут БД, поэтому потоки дешевле дополнительных процессов;
+# gevent - кооперативные гринлеты для множества медленных клиентов;
+# uvicorn.workers.UvicornWorker - ASGI-приложение (api_yamdb.asgi), Django
+# выполняется в пулах потоков ASGI_READ_THREADS и ASGI_THREADS.
+ASGI_WORKER = 'uvicorn.workers.UvicornWorker'
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='gthread')
+wsgi_app = (
+    'api_yamdb.asgi:application' if worker_class == ASGI_WORKER
+    else 'api_yamdb.wsgi:application'
+)
+# Кэш в памяти процесса (CACHE_BACKEND по умолчанию) у каждого воркера
+# свой: отметки об изменении пользователей, счётчики ограничений и кэш
+# ответов не видны соседям. Несколько воркеров - только с общим кэшем.
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+shared_cache = os.getenv(
+    'CACHE_BACKEND', default=LOCAL_CACHE_BACKENDS[0]
+) not in LOCAL_CACHE_BACKENDS
+workers = int(os.getenv(
+    'GUNICORN_WORKERS', default=cpu_count() * 2 + 1 if shared_cache else 1
+))
+threads = int(os.getenv(
+    'GUNICORN_THREADS', default=4 if worker_class == 'gthread' else 1
+))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', default=100))
+
+# Каждый поток (и каждый гринлет gevent) держит своё соединение с
+# PostgreSQL при CONN_MAX_AGE > 0, поэтому workers * threads не должно
+# превышать max_connections базы. С gevent ставьте DB_CONN_MAX_AGE=0
+# или пул соединений (pgbouncer) перед базой.
+
+# Дольше, чем keepalive_timeout в upstream nginx: соединение закрывает
+# nginx, а не gunicorn посреди отправки следующего запроса.
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', default=75))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', default=30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', default=30))
+
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', default=1000))
+max_requests_jitter = max_requests // 10
+
+# Heartbeat воркеров в tmpfs, а не на overlay-файловой системе контейнера.
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
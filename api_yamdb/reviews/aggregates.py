@@ -0,0 +1,177 @@
+from django.db.models import (Count, ExpressionWrapper, F, FloatField, Max,
+                              OuterRef, Q, Subquery, Sum)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import SCORES, Comments, Review, Title, TitleStats
+
+RECALCULATE_BATCH_SIZE = 1000
+
+ratings_changed = Signal(providing_args=['title_ids'])
+
+
+def rating_expression(rating_sum, review_count):
+    return ExpressionWrapper(
+        Cast(rating_sum, FloatField()) / NullIf(review_count, 0),
+        output_field=FloatField()
+    )
+
+
+def touched():
+    return {
+        'version': F('version') + 1,
+        'modified': timezone.now(),
+    }
+
+
+def touch_titles(**lookups):
+    Title.objects.filter(**lookups).update(**touched())
+
+
+def apply_review_delta(title_id, score_delta, count_delta):
+    rating_sum = F('rating_sum') + score_delta
+    review_count = F('review_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        review_count=review_count,
+        rating=rating_expression(rating_sum, review_count),
+        **touched()
+    )
+    ratings_changed.send(sender=Title, title_ids=[title_id])
+
+
+def apply_comment_delta(review_id, count_delta):
+    Review.objects.filter(pk=review_id).update(
+        comment_count=F('comment_count') + count_delta
+    )
+
+
+def real_rating_expressions():
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    return (
+        Coalesce(Subquery(
+            reviews.annotate(total=Sum('score')).values('total')
+        ), 0),
+        Coalesce(Subquery(
+            reviews.annotate(total=Count('pk')).values('total')
+        ), 0),
+    )
+
+
+def recalculate_ratings(title_ids=None):
+    titles = Title.objects.order_by()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    real_sum, real_count = real_rating_expressions()
+    drifted_ids = list(titles.annotate(
+        real_sum=real_sum,
+        real_count=real_count,
+    ).exclude(
+        rating_sum=F('real_sum'),
+        review_count=F('real_count'),
+    ).values_list('pk', flat=True).iterator())
+    for start in range(0, len(drifted_ids), RECALCULATE_BATCH_SIZE):
+        real_sum, real_count = real_rating_expressions()
+        Title.objects.filter(
+            pk__in=drifted_ids[start:start + RECALCULATE_BATCH_SIZE]
+        ).update(
+            rating_sum=real_sum,
+            review_count=real_count,
+            rating=rating_expression(real_sum, real_count),
+            **touched()
+        )
+    if drifted_ids:
+        ratings_changed.send(sender=Title, title_ids=drifted_ids)
+    return len(drifted_ids)
+
+
+def real_comment_count():
+    return Coalesce(Subquery(
+        Comments.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review').annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def recalculate_comment_counts(review_ids=None):
+    reviews = Review.objects.order_by()
+    if review_ids is not None:
+        reviews = reviews.filter(pk__in=review_ids)
+    # Один UPDATE по всей таблице: после загрузки данных расходятся все
+    # отзывы, и список их id в памяти не нужен.
+    return reviews.exclude(
+        comment_count=real_comment_count()
+    ).update(comment_count=real_comment_count())
+
+
+def latest_pub_date(title_id):
+    return Subquery(
+        Review.objects.filter(
+            title=title_id
+        ).order_by('-pub_date').values('pub_date')[:1]
+    )
+
+
+def apply_stats_delta(title_id, score_counts):
+    TitleStats.objects.filter(title_id=title_id).update(
+        count=F('count') + sum(score_counts.values()),
+        latest_pub_date=latest_pub_date(title_id),
+        **{
+            TitleStats.score_field(score): (
+                F(TitleStats.score_field(score)) + count
+            )
+            for score, count in score_counts.items() if count
+        }
+    )
+
+
+def real_stats(title_ids):
+    rows = Review.objects.filter(
+        title_id__in=title_ids
+    ).order_by().values('title_id').annotate(
+        count=Count('pk'),
+        latest_pub_date=Max('pub_date'),
+        **{
+            TitleStats.score_field(score): Count('pk', filter=Q(score=score))
+            for score in SCORES
+        }
+    )
+    stats = {
+        title_id: TitleStats(title_id=title_id) for title_id in title_ids
+    }
+    stats.update((row['title_id'], TitleStats(**row)) for row in rows)
+    return stats
+
+
+def rebuild_title_stats(title_ids=None):
+    titles = Title.objects.order_by('pk')
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    title_ids = list(titles.values_list('pk', flat=True).iterator())
+    fields = ['count', 'latest_pub_date'] + [
+        TitleStats.score_field(score) for score in SCORES
+    ]
+    fixed = 0
+    for start in range(0, len(title_ids), RECALCULATE_BATCH_SIZE):
+        real = real_stats(title_ids[start:start + RECALCULATE_BATCH_SIZE])
+        stored = TitleStats.objects.in_bulk(real.keys())
+        drifted = [
+            stats for title_id, stats in real.items()
+            if title_id in stored and any(
+                getattr(stats, field) != getattr(stored[title_id], field)
+                for field in fields
+            )
+        ]
+        missing = [
+            stats for title_id, stats in real.items()
+            if title_id not in stored
+        ]
+        TitleStats.objects.bulk_update(drifted, fields)
+        TitleStats.objects.bulk_create(missing, ignore_conflicts=True)
+        fixed += len(drifted) + len(missing)
+    return fixed
@@ -0,0 +1,138 @@
+import csv
+import json
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Comments, Review, Title
+
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+CHUNK_SIZE = 2000
+INCORRECT_SINCE = 'Некорректная дата: {value}'
+
+
+def parse_since(value):
+    if not value:
+        return None
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(INCORRECT_SINCE.format(value=value))
+        since = datetime.combine(date, time.min)
+    if timezone.is_naive(since):
+        return timezone.make_aware(since, timezone.utc)
+    return since
+
+
+def title_rows(since):
+    titles = Title.objects.order_by('pk')
+    links = Title.genre.through.objects.order_by('title_id')
+    if since is not None:
+        titles = titles.filter(modified__gte=since)
+        links = links.filter(title__modified__gte=since)
+    links = links.values_list('title_id', 'genre__slug').iterator(
+        chunk_size=CHUNK_SIZE
+    )
+    link = next(links, None)
+    for title in titles.values_list(
+        'id', 'name', 'year', 'category_id', 'description', 'category__slug'
+    ).iterator(chunk_size=CHUNK_SIZE):
+        genres = []
+        while link is not None and link[0] <= title[0]:
+            if link[0] == title[0]:
+                genres.append(link[1])
+            link = next(links, None)
+        yield title + (' '.join(genres),)
+
+
+def genre_title_rows(since):
+    links = Title.genre.through.objects.order_by('pk')
+    if since is not None:
+        links = links.filter(title__modified__gte=since)
+    return links.values_list('id', 'title_id', 'genre_id').iterator(
+        chunk_size=CHUNK_SIZE
+    )
+
+
+def review_rows(since):
+    reviews = Review.objects.order_by('pk')
+    if since is not None:
+        reviews = reviews.filter(pub_date__gte=since)
+    return reviews.values_list(
+        'id', 'text', 'score', 'pub_date', 'author_id', 'title_id'
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+def comment_rows(since):
+    comments = Comments.objects.order_by('pk')
+    if since is not None:
+        comments = comments.filter(pub_date__gte=since)
+    return comments.values_list(
+        'id', 'review_id', 'text', 'author_id', 'pub_date'
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+
+# Заголовки совпадают с csv-файлами, которые читает load_test_db.
+DATASETS = {
+    'titles': (
+        ('id', 'name', 'year', 'category_id', 'description', 'category',
+         'genre'),
+        title_rows,
+    ),
+    'genre_title': (('id', 'title_id', 'genre_id'), genre_title_rows),
+    'reviews': (
+        ('id', 'text', 'score', 'pub_date', 'author_id', 'title_id'),
+        review_rows,
+    ),
+    'comments': (
+        ('id', 'review_id', 'text', 'author_id', 'pub_date'),
+        comment_rows,
+    ),
+}
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    # Время с микросекундами, как в csv: DjangoJSONEncoder обрезает его до
+    # миллисекунд, и загруженные обратно данные отличались бы от исходных.
+
+    def default(self, value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return super().default(value)
+
+
+class Echo:
+
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def export_lines(dataset, output_format, since=None):
+    headers, rows = DATASETS[dataset]
+    if output_format == 'ndjson':
+        for row in rows(since):
+            yield json.dumps(
+                dict(zip(headers, row)),
+                cls=ExportEncoder,
+                ensure_ascii=False
+            ) + '\n'
+        return
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    for row in rows(since):
+        yield writer.writerow([csv_value(value) for value in row])
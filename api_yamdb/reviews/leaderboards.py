@@ -0,0 +1,165 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (Count, ExpressionWrapper, F, FloatField, Max, Q,
+                              Sum)
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import Category, Genre, Leaderboard, Review, Title, TitleRanking
+
+SCOPE_FIELDS = {
+    'genre': Genre,
+    'category': Category,
+}
+
+
+def scope_key(field, pk):
+    return f'{field}:{pk}'
+
+
+def scope_filter(scope):
+    if scope == Leaderboard.GLOBAL_SCOPE:
+        return Q()
+    field, pk = scope.split(':')
+    return Q(**{field: int(pk)})
+
+
+def all_scopes():
+    scopes = {Leaderboard.GLOBAL_SCOPE}
+    for field, model in SCOPE_FIELDS.items():
+        scopes |= {
+            scope_key(field, pk)
+            for pk in model.objects.values_list('pk', flat=True)
+        }
+    return scopes
+
+
+def title_scopes(title_ids):
+    # Произведение могло уйти из жанра или категории: его старые таблицы
+    # тоже пересобираются.
+    scopes = {Leaderboard.GLOBAL_SCOPE}
+    scopes |= {
+        scope_key('genre', pk) for pk in Title.genre.through.objects.filter(
+            title_id__in=title_ids
+        ).values_list('genre_id', flat=True).distinct()
+    }
+    scopes |= {
+        scope_key('category', pk) for pk in Title.objects.filter(
+            pk__in=title_ids, category__isnull=False
+        ).values_list('category_id', flat=True).distinct()
+    }
+    scopes |= set(TitleRanking.objects.filter(
+        title_id__in=title_ids
+    ).values_list('leaderboard__scope', flat=True).distinct())
+    return scopes
+
+
+def trending_window():
+    return timedelta(days=settings.LEADERBOARD_TRENDING_DAYS)
+
+
+def changed_titles(since, now):
+    # Изменённые произведения (отзывы обновляют Title.modified) и те,
+    # у которых отзывы с прошлого обновления вышли из окна популярности.
+    window = trending_window()
+    changed = set(Title.objects.filter(
+        modified__gt=since
+    ).values_list('pk', flat=True))
+    changed |= set(Review.objects.filter(
+        pub_date__gte=since - window,
+        pub_date__lt=now - window,
+    ).values_list('title_id', flat=True).distinct())
+    return changed
+
+
+def shrunk_scopes():
+    # Удалённые произведения пропадают из таблиц каскадом, оставляя дыры
+    # в местах; таблицы ограничены LEADERBOARD_SIZE, так что счёт дешёвый.
+    return set(Leaderboard.objects.annotate(
+        actual=Count('rankings')
+    ).exclude(size=F('actual')).values_list('scope', flat=True))
+
+
+def mean_score():
+    totals = Title.objects.aggregate(
+        rating_sum=Sum('rating_sum'), review_count=Sum('review_count')
+    )
+    if not totals['review_count']:
+        return 0.0
+    return totals['rating_sum'] / totals['review_count']
+
+
+def bayesian_expression(mean):
+    prior = settings.LEADERBOARD_PRIOR_REVIEWS
+    return ExpressionWrapper(
+        (Cast('rating_sum', FloatField()) + prior * mean)
+        / (F('review_count') + prior),
+        output_field=FloatField()
+    )
+
+
+def ranked_titles(kind, scope, now, mean):
+    titles = Title.objects.filter(scope_filter(scope)).order_by()
+    if kind == Leaderboard.TOP:
+        titles = titles.filter(review_count__gt=0).annotate(
+            score=bayesian_expression(mean)
+        )
+    else:
+        window = trending_window()
+        titles = titles.filter(
+            reviews__pub_date__gte=now - window
+        ).annotate(score=ExpressionWrapper(
+            Cast(Count('reviews'), FloatField()) / window.days,
+            output_field=FloatField()
+        ))
+    return titles.order_by(
+        '-score', F('rating').desc(nulls_last=True), 'pk'
+    ).values_list('pk', 'score')[:settings.LEADERBOARD_SIZE]
+
+
+@transaction.atomic
+def rebuild_leaderboard(kind, scope, now, mean):
+    board, _ = Leaderboard.objects.get_or_create(
+        kind=kind, scope=scope, defaults={'refreshed': now}
+    )
+    board = Leaderboard.objects.select_for_update().get(pk=board.pk)
+    rankings = [
+        TitleRanking(
+            leaderboard=board, position=position, title_id=title_id,
+            score=score
+        )
+        for position, (title_id, score) in enumerate(
+            ranked_titles(kind, scope, now, mean), 1
+        )
+    ]
+    TitleRanking.objects.filter(leaderboard=board).delete()
+    TitleRanking.objects.bulk_create(
+        rankings, batch_size=settings.BULK_BATCH_SIZE
+    )
+    board.size = len(rankings)
+    board.refreshed = now
+    board.save(update_fields=['size', 'refreshed'])
+
+
+def refresh_leaderboards(full=False):
+    now = timezone.now()
+    since = None if full else Leaderboard.objects.aggregate(
+        since=Max('refreshed')
+    )['since']
+    if since is None:
+        scopes = all_scopes()
+        Leaderboard.objects.exclude(scope__in=scopes).delete()
+    else:
+        changed = changed_titles(since, now)
+        scopes = shrunk_scopes()
+        if changed:
+            scopes |= title_scopes(changed)
+        if not scopes:
+            return 0
+    mean = mean_score()
+    for scope in sorted(scopes):
+        for kind, _ in Leaderboard.KINDS:
+            rebuild_leaderboard(kind, scope, now, mean)
+    return len(scopes)
@@ -0,0 +1,165 @@
+import csv
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .aggregates import (rebuild_title_stats, recalculate_comment_counts,
+                         recalculate_ratings)
+from .search import update_search_vectors
+
+COPY_SQL = 'COPY {table} ({columns}) FROM STDIN'
+INSERT_SQL = 'INSERT INTO {table} ({columns}) VALUES ({placeholders})'
+REPORT = '{table}: {rows} строк за {seconds:.2f} с ({speed:.0f} строк/с)'
+
+
+def missing_value(field):
+    if getattr(field, 'auto_now', False) or getattr(
+        field, 'auto_now_add', False
+    ):
+        return timezone.now()
+    return field.get_default()
+
+
+def copy_text(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+class Table:
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = model._meta.concrete_fields
+        self.table = connection.ops.quote_name(model._meta.db_table)
+        self.columns = ', '.join(
+            connection.ops.quote_name(field.column) for field in self.fields
+        )
+
+    def records(self):
+        raise NotImplementedError
+
+    def parse(self, field, value):
+        return value
+
+    def rows(self, batch_size):
+        batch = []
+        for data in self.records():
+            batch.append([
+                self.parse(field, data[field.attname])
+                if field.attname in data else missing_value(field)
+                for field in self.fields
+            ])
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def copy(self, cursor, batch):
+        buffer = io.StringIO()
+        for row in batch:
+            buffer.write('\t'.join(copy_text(value) for value in row))
+            buffer.write('\n')
+        buffer.seek(0)
+        cursor.cursor.copy_expert(
+            COPY_SQL.format(table=self.table, columns=self.columns),
+            buffer
+        )
+
+    def insert(self, cursor, batch):
+        cursor.executemany(
+            INSERT_SQL.format(
+                table=self.table,
+                columns=self.columns,
+                placeholders=', '.join(['%s'] * len(self.fields))
+            ),
+            [
+                [
+                    field.get_db_prep_save(value, connection)
+                    for field, value in zip(self.fields, row)
+                ]
+                for row in batch
+            ]
+        )
+
+    def load(self, batch_size):
+        use_copy = connection.vendor == 'postgresql'
+        loaded = 0
+        started = time.monotonic()
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                for batch in self.rows(batch_size):
+                    if use_copy:
+                        self.copy(cursor, batch)
+                    else:
+                        self.insert(cursor, batch)
+                    loaded += len(batch)
+        finally:
+            connection.close()
+        return self.model._meta.db_table, loaded, (
+            time.monotonic() - started
+        )
+
+
+class CsvTable(Table):
+
+    def __init__(self, model, path):
+        super().__init__(model)
+        self.path = path
+
+    def parse(self, field, value):
+        if value == '' and (field.null or not field.empty_strings_allowed):
+            return None
+        return field.to_python(value)
+
+    def records(self):
+        with open(self.path, 'r', encoding='utf-8', newline='') as csv_file:
+            yield from csv.DictReader(csv_file)
+
+
+class GeneratedTable(Table):
+
+    def __init__(self, model, records):
+        super().__init__(model)
+        self.generate = records
+
+    def records(self):
+        return self.generate()
+
+
+def load_levels(levels, batch_size, workers, report):
+    if connection.vendor == 'sqlite':
+        workers = 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for level in levels:
+            for table, rows, seconds in executor.map(
+                lambda table: table.load(batch_size), level
+            ):
+                report(REPORT.format(
+                    table=table,
+                    rows=rows,
+                    seconds=seconds,
+                    speed=rows / seconds if seconds else rows,
+                ))
+
+
+def finish_loading(models):
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+    recalculate_ratings()
+    recalculate_comment_counts()
+    rebuild_title_stats()
+    update_search_vectors()
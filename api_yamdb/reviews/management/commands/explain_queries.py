@@ -0,0 +1,69 @@
+import statistics
+import time
+
+from django.core.management import BaseCommand
+from reviews.models import Comments, Review, Title
+
+PAGE_SIZE = 100
+REPEAT = 20
+TIMING = (
+    'медиана {median:.2f} мс, максимум {slowest:.2f} мс '
+    'за {repeat} запусков'
+)
+
+
+def hot_queries():
+    title = Title.objects.order_by('pk').first()
+    review = Review.objects.order_by('pk').first()
+    category_id = title.category_id if title else None
+    genre = title.genre.first() if title else None
+    return {
+        'Произведения категории по году': Title.objects.filter(
+            category_id=category_id
+        ).order_by('-year')[:PAGE_SIZE],
+        'Произведения жанра по году': Title.objects.filter(
+            genre=genre
+        ).order_by('-year')[:PAGE_SIZE],
+        'Отзывы на произведение': Review.objects.filter(
+            title=title
+        ).order_by('-pub_date', '-id')[:PAGE_SIZE],
+        'Комментарии к отзыву': Comments.objects.filter(
+            review=review
+        ).order_by('-pub_date', '-id')[:PAGE_SIZE],
+    }
+
+
+def time_query(queryset, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        list(queryset.all())
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время и печатает планы (EXPLAIN) самых частых '
+            'запросов API, чтобы сравнить их до и после миграции с индексами')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Выполнить запросы (EXPLAIN ANALYZE, только PostgreSQL)'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=REPEAT,
+            help='Сколько раз выполнить каждый запрос для замера времени'
+        )
+
+    def handle(self, *args, **options):
+        explain_options = {'analyze': True} if options['analyze'] else {}
+        for name, queryset in hot_queries().items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            median, slowest = time_query(queryset, options['repeat'])
+            self.stdout.write(TIMING.format(
+                median=median, slowest=slowest, repeat=options['repeat']
+            ))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write('')
@@ -0,0 +1,28 @@
+import sys
+
+from django.core.management import BaseCommand, CommandError
+from reviews.export import DATASETS, FORMATS, export_lines, parse_since
+
+
+class Command(BaseCommand):
+    help = 'Выгружает произведения, отзывы и комментарии в csv или ndjson'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=DATASETS)
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--since', default=None)
+        parser.add_argument('--output', default=None)
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_since(options['since'])
+        except ValueError as error:
+            raise CommandError(error)
+        lines = export_lines(options['dataset'], options['format'], since)
+        if options['output'] is None:
+            sys.stdout.writelines(lines)
+            return
+        with open(
+            options['output'], 'w', encoding='utf-8', newline=''
+        ) as output:
+            output.writelines(lines)
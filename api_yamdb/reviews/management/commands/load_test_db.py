@@ -1,55 +1,58 @@
-import csv
+import os
 
 from django.conf import settings
-from django.core.management import BaseCommand
-from django.db import connection
+from django.core.management import BaseCommand, CommandError
 
+from reviews.loading import CsvTable, finish_loading, load_levels
 from reviews.models import Category, Comments, Genre, Review, Title, User
 
 
-MODELS = {
-    User: 'users.csv',
-    Category: 'category.csv',
-    Genre: 'genre.csv',
-    Title: 'titles.csv',
-    Review: 'review.csv',
-    Comments: 'comments.csv',
-}
-
-TABLES = {
-    'reviews_title_genre': 'genre_title.csv',
-}
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+BATCH_SIZE = 10000
+WORKERS = 4
+
+# Таблицы одного уровня не ссылаются друг на друга и грузятся параллельно.
+LEVELS = (
+    (
+        (User, 'users.csv'),
+        (Category, 'category.csv'),
+        (Genre, 'genre.csv'),
+    ),
+    (
+        (Title, 'titles.csv'),
+    ),
+    (
+        (Review, 'review.csv'),
+        (Title.genre.through, 'genre_title.csv'),
+    ),
+    (
+        (Comments, 'comments.csv'),
+    ),
+)
 
 
 class Command(BaseCommand):
-
-    def handle(self, *args, **kwargs):
-        for model, csv_name in MODELS.items():
-            with open(
-                f'{settings.BASE_DIR}/static/data/{csv_name}',
-                'r',
-                encoding='utf-8'
-            ) as csv_file:
-                reader = csv.DictReader(csv_file)
-                model.objects.bulk_create(
-                    model(**data) for data in reader)
-        for table, csv_name in TABLES.items():
-            with open(
-                f'{settings.BASE_DIR}/static/data/{csv_name}',
-                'r',
-                encoding='utf-8'
-            ) as csv_file:
-                reader = csv.DictReader(csv_file)
-                to_db = [(
-                    data['id'],
-                    data['title_id'],
-                    data['genre_id']
-                ) for data in reader]
-                cursor = connection.cursor()
-                cursor.executemany(
-                    f'INSERT INTO {table} VALUES(?, ?, ?)',
-                    to_db
-                )
-                connection.commit()
-                cursor.close
+    help = 'Загружает данные из csv-файлов в базу'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=DATA_DIR)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=WORKERS)
+
+    def handle(self, *args, **options):
+        levels = [
+            [
+                CsvTable(model, os.path.join(options['path'], csv_name))
+                for model, csv_name in level
+            ] for level in LEVELS
+        ]
+        for level in levels:
+            for table in level:
+                if not os.path.exists(table.path):
+                    raise CommandError(f'Файл {table.path} не найден')
+        load_levels(
+            levels, options['batch_size'], options['workers'],
+            self.stdout.write
+        )
+        finish_loading([model for level in LEVELS for model, _ in level])
         self.stdout.write(self.style.SUCCESS('Все данные загружены'))
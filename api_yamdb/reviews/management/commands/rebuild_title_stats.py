@@ -0,0 +1,12 @@
+from django.core.management import BaseCommand
+from reviews.aggregates import rebuild_title_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает статистику оценок произведений по отзывам'
+
+    def handle(self, *args, **kwargs):
+        fixed = rebuild_title_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено записей статистики: {fixed}'
+        ))
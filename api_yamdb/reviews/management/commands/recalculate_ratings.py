@@ -0,0 +1,12 @@
+from django.core.management import BaseCommand
+from reviews.aggregates import recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые рейтинги произведений'
+
+    def handle(self, *args, **kwargs):
+        drifted = recalculate_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено рейтингов: {drifted}'
+        ))
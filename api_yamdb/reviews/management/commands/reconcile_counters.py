@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+from reviews.aggregates import recalculate_comment_counts, recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счётчики отзывов произведений и комментариев отзывов '
+        'с таблицами и исправляет расхождения'
+    )
+
+    def handle(self, *args, **kwargs):
+        titles = recalculate_ratings()
+        reviews = recalculate_comment_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено произведений: {titles}, отзывов: {reviews}'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand
+from reviews.leaderboards import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет рейтинги лучших и популярных произведений: по умолчанию '
+        'только таблицы с изменениями с прошлого запуска'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересобрать все таблицы (и учесть новую среднюю оценку)'
+        )
+
+    def handle(self, *args, **options):
+        scopes = refresh_leaderboards(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено областей рейтингов: {scopes}'
+        ))
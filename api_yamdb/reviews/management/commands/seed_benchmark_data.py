@@ -0,0 +1,161 @@
+import random
+from datetime import timedelta
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from reviews.loading import GeneratedTable, finish_loading, load_levels
+from reviews.models import Category, Comments, Genre, Review, Title, User
+
+BATCH_SIZE = 10000
+WORKERS = 4
+PERIOD = int(timedelta(days=730).total_seconds())
+MAX_GENRES_PER_TITLE = 3
+MODELS = (User, Category, Genre, Title, Title.genre.through, Review, Comments)
+
+
+class Generator:
+
+    def __init__(self, options):
+        self.seed = options['seed']
+        self.users = options['users']
+        self.categories = options['categories']
+        self.genres = options['genres']
+        self.titles = options['titles']
+        self.reviews = options['reviews']
+        self.comments = options['comments']
+        self.now = timezone.now()
+
+    def random(self, table):
+        return random.Random(f'{self.seed}:{table}')
+
+    def pub_date(self, rng):
+        return self.now - timedelta(seconds=rng.randrange(PERIOD))
+
+    def user_records(self):
+        for pk in range(1, self.users + 1):
+            yield {
+                'id': pk,
+                'username': f'bench{pk}',
+                'email': f'bench{pk}@example.com',
+                'password': '!',
+            }
+
+    def category_records(self):
+        for pk in range(1, self.categories + 1):
+            yield {'id': pk, 'name': f'Категория {pk}', 'slug': f'c-{pk}'}
+
+    def genre_records(self):
+        for pk in range(1, self.genres + 1):
+            yield {'id': pk, 'name': f'Жанр {pk}', 'slug': f'g-{pk}'}
+
+    def title_records(self):
+        rng = self.random('titles')
+        year = self.now.year
+        for pk in range(1, self.titles + 1):
+            yield {
+                'id': pk,
+                'name': f'Произведение {pk}',
+                'year': rng.randint(year - 100, year),
+                'category_id': rng.randint(1, self.categories),
+                'description': f'Описание произведения {pk}',
+            }
+
+    def genre_title_records(self):
+        rng = self.random('genre_title')
+        pk = 0
+        for title_id in range(1, self.titles + 1):
+            count = rng.randint(1, min(MAX_GENRES_PER_TITLE, self.genres))
+            for genre_id in rng.sample(range(1, self.genres + 1), count):
+                pk += 1
+                yield {'id': pk, 'title_id': title_id, 'genre_id': genre_id}
+
+    def review_records(self):
+        rng = self.random('reviews')
+        for index in range(self.reviews):
+            title_id = index % self.titles + 1
+            # Для одного произведения авторы различаются, пока
+            # reviews <= titles * users: unique_review не нарушается.
+            author_id = (index // self.titles + title_id) % self.users + 1
+            yield {
+                'id': index + 1,
+                'title_id': title_id,
+                'author_id': author_id,
+                'score': rng.randint(1, 10),
+                'text': f'Отзыв {index + 1}',
+                'pub_date': self.pub_date(rng),
+            }
+
+    def comment_records(self):
+        rng = self.random('comments')
+        for pk in range(1, self.comments + 1):
+            yield {
+                'id': pk,
+                'review_id': rng.randint(1, self.reviews),
+                'author_id': rng.randint(1, self.users),
+                'text': f'Комментарий {pk}',
+                'pub_date': self.pub_date(rng),
+            }
+
+    def levels(self):
+        return (
+            (
+                GeneratedTable(User, self.user_records),
+                GeneratedTable(Category, self.category_records),
+                GeneratedTable(Genre, self.genre_records),
+            ),
+            (
+                GeneratedTable(Title, self.title_records),
+            ),
+            (
+                GeneratedTable(Review, self.review_records),
+                GeneratedTable(Title.genre.through, self.genre_title_records),
+            ),
+            (
+                GeneratedTable(Comments, self.comment_records),
+            ),
+        )
+
+
+class Command(BaseCommand):
+    help = 'Заполняет пустую базу синтетическими данными для замеров'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=40000)
+        parser.add_argument(
+            '--users', type=int, default=None,
+            help='По умолчанию - минимум для уникальных отзывов, не меньше 100'
+        )
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=WORKERS)
+
+    def handle(self, *args, **options):
+        if options['users'] is None:
+            options['users'] = max(
+                100, -(-options['reviews'] // max(options['titles'], 1))
+            )
+        if min(options['titles'], options['categories'],
+               options['genres'], options['users']) < 1:
+            raise CommandError('Нужно хотя бы по одной записи в справочниках')
+        if options['reviews'] > options['titles'] * options['users']:
+            raise CommandError(
+                'Отзывов больше, чем пар произведение-автор: увеличьте --users'
+            )
+        if options['comments'] and not options['reviews']:
+            raise CommandError('Комментариям нужны отзывы')
+        for model in MODELS:
+            if model.objects.exists():
+                raise CommandError(
+                    f'Таблица {model._meta.db_table} не пуста: '
+                    'для замеров нужна отдельная база'
+                )
+        load_levels(
+            Generator(options).levels(), options['batch_size'],
+            options['workers'], self.stdout.write
+        )
+        finish_loading(MODELS)
+        self.stdout.write(self.style.SUCCESS('Данные для замеров созданы'))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+from reviews.outbox import deliver_pending, metrics, queue_depth
+
+POLL_INTERVAL = 5
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди OutgoingEmail'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--interval', type=float, default=POLL_INTERVAL)
+        parser.add_argument('--stats', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(f'queue_depth: {queue_depth()}')
+            return
+        while True:
+            close_old_connections()
+            sent = deliver_pending(options['batch_size'])
+            if sent:
+                self.stdout.write(
+                    f'Отправлено: {sent}, в очереди: {queue_depth()}'
+                )
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            'Отправлено всего: {sent}, ошибок: {failed}'.format(**metrics)
+        ))
@@ -0,0 +1,57 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:17
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_INDEXES = (
+    ('reviews_title_search_vector_gin',
+     'reviews_title USING gin (search_vector)'),
+    ('reviews_title_name_trgm',
+     'reviews_title USING gin (name gin_trgm_ops)'),
+    ('reviews_title_name_upper_trgm',
+     'reviews_title USING gin (UPPER(name) gin_trgm_ops)'),
+    ('reviews_category_name_upper_trgm',
+     'reviews_category USING gin (UPPER(name) gin_trgm_ops)'),
+    ('reviews_genre_name_upper_trgm',
+     'reviews_genre USING gin (UPPER(name) gin_trgm_ops)'),
+)
+
+FILL_SEARCH_VECTOR = (
+    "UPDATE reviews_title SET search_vector = "
+    "setweight(to_tsvector('russian', COALESCE(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', COALESCE(description, '')), 'B')"
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, definition in SEARCH_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {definition}'
+        )
+    schema_editor.execute(FILL_SEARCH_VECTOR)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
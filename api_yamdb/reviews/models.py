@@ -1,10 +1,16 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 from .validations import validate_username, validate_year
 
+MIN_SCORE = 1
+MAX_SCORE = 10
+SCORES = range(MIN_SCORE, MAX_SCORE + 1)
+
 
 class BaseDescription(models.Model):
     name = models.CharField(
@@ -38,11 +44,36 @@ class Genre(BaseDescription):
         verbose_name_plural = 'Жанры'
 
 
-class Title(models.Model):
+class ComputedFieldsMixin:
+    # Поля computed_fields меняются только UPDATE с F() (reviews.aggregates,
+    # reviews.search). save() уже существующего объекта их не пишет, иначе
+    # объект, прочитанный до новых отзывов, затёр бы счётчики старыми
+    # значениями.
+    computed_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and self.pk is not None:
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key
+                ]
+            kwargs['update_fields'] = [
+                name for name in update_fields
+                if name not in self.computed_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class Title(ComputedFieldsMixin, models.Model):
     DISPLAY = (
         '{name}, '
         '{year}'
     )
+    computed_fields = (
+        'rating_sum', 'review_count', 'rating', 'version', 'search_vector'
+    )
 
     name = models.TextField(
         db_index=True,
@@ -71,6 +102,36 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Жанр'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок'
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов'
+    )
+    rating = models.FloatField(
+        null=True,
+        db_index=True,
+        editable=False,
+        verbose_name='Рейтинг'
+    )
+    version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия'
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False
+    )
 
     def __str__(self):
         return self.DISPLAY.format(
@@ -81,6 +142,12 @@ class Title(models.Model):
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                fields=['category', '-year', '-id'],
+                name='title_category_year_idx'
+            ),
+        ]
 
 
 class User(AbstractUser):
@@ -179,7 +246,10 @@ class BaseFeedBack(models.Model):
         ordering = ['-pub_date']
 
 
-class Review(BaseFeedBack):
+class Review(ComputedFieldsMixin, BaseFeedBack):
+    loaded_rating = None
+    computed_fields = ('comment_count',)
+
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE
@@ -187,10 +257,22 @@ class Review(BaseFeedBack):
     score = models.IntegerField(
         default=1,
         validators=[
-            MaxValueValidator(10),
-            MinValueValidator(1)
+            MaxValueValidator(MAX_SCORE),
+            MinValueValidator(MIN_SCORE)
         ]
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {'title_id', 'score'} <= set(field_names):
+            instance.loaded_rating = (instance.title_id, instance.score)
+        return instance
 
     class Meta(BaseFeedBack.Meta):
         default_related_name = 'reviews'
@@ -202,15 +284,224 @@ class Review(BaseFeedBack):
                 name='unique_review'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
 
 
 class Comments(BaseFeedBack):
+    loaded_review_id = None
+
     review = models.ForeignKey(
         Review,
         on_delete=models.CASCADE
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'review_id' in field_names:
+            instance.loaded_review_id = instance.review_id
+        return instance
+
     class Meta(BaseFeedBack.Meta):
         default_related_name = 'comments'
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
+
+
+class TitleStats(models.Model):
+    title = models.OneToOneField(
+        Title,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Произведение'
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов'
+    )
+    latest_pub_date = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата последнего отзыва'
+    )
+
+    @staticmethod
+    def score_field(score):
+        return f'score_{score}'
+
+    @property
+    def histogram(self):
+        return {
+            score: getattr(self, self.score_field(score)) for score in SCORES
+        }
+
+    @property
+    def median(self):
+        if not self.count:
+            return None
+        # Медиана по гистограмме: средние элементы упорядоченных оценок.
+        middle = ((self.count - 1) // 2, self.count // 2)
+        values, seen = [], 0
+        for score, count in self.histogram.items():
+            seen += count
+            while len(values) < len(middle) and middle[len(values)] < seen:
+                values.append(score)
+        return sum(values) / 2
+
+    def __str__(self):
+        return f'{self.title_id}: {self.count}'
+
+    class Meta:
+        verbose_name = 'Статистика оценок'
+        verbose_name_plural = 'Статистика оценок'
+
+
+for score in SCORES:
+    TitleStats.add_to_class(
+        TitleStats.score_field(score),
+        models.PositiveIntegerField(
+            default=0,
+            verbose_name=f'Оценок {score}'
+        )
+    )
+
+
+class Leaderboard(models.Model):
+    TOP = 'top'
+    TRENDING = 'trending'
+    KINDS = [
+        (TOP, 'Лучшие по рейтингу'),
+        (TRENDING, 'Популярные сейчас'),
+    ]
+    GLOBAL_SCOPE = 'all'
+
+    kind = models.CharField(
+        verbose_name='Вид',
+        max_length=max(len(kind) for kind, _ in KINDS),
+        choices=KINDS
+    )
+    scope = models.CharField(
+        verbose_name='Область',
+        max_length=settings.MAX_LENGTH_SLUG
+    )
+    size = models.PositiveIntegerField(
+        verbose_name='Мест',
+        default=0
+    )
+    refreshed = models.DateTimeField(
+        verbose_name='Дата обновления'
+    )
+
+    def __str__(self):
+        return f'{self.kind}: {self.scope}'
+
+    class Meta:
+        verbose_name = 'Рейтинг произведений'
+        verbose_name_plural = 'Рейтинги произведений'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'scope'],
+                name='unique_leaderboard'
+            ),
+        ]
+
+
+class TitleRanking(models.Model):
+    leaderboard = models.ForeignKey(
+        Leaderboard,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        verbose_name='Рейтинг'
+    )
+    position = models.PositiveIntegerField(
+        verbose_name='Место'
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        verbose_name='Произведение'
+    )
+    score = models.FloatField(
+        verbose_name='Оценка'
+    )
+
+    def __str__(self):
+        return f'{self.position}. {self.title_id}'
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтингах'
+        ordering = ('position',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['leaderboard', 'position'],
+                name='unique_ranking_position'
+            ),
+        ]
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField(
+        verbose_name='Тема',
+        max_length=settings.MAX_LENGTH_NAME_DESCRIPTION
+    )
+    body = models.TextField(
+        verbose_name='Текст'
+    )
+    from_email = models.EmailField(
+        verbose_name='Отправитель',
+        max_length=settings.MAX_LENGTH_EMAIL
+    )
+    recipient = models.EmailField(
+        verbose_name='Получатель',
+        max_length=settings.MAX_LENGTH_EMAIL
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True
+    )
+    next_attempt = models.DateTimeField(
+        verbose_name='Следующая попытка',
+        default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Количество попыток',
+        default=0
+    )
+    sent = models.DateTimeField(
+        verbose_name='Дата отправки',
+        null=True,
+        blank=True
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True
+    )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
+
+    class Meta:
+        verbose_name = 'Письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('next_attempt',)
+        indexes = [
+            models.Index(
+                fields=['next_attempt'],
+                name='outgoing_email_pending_idx',
+                condition=models.Q(sent__isnull=True)
+            ),
+        ]
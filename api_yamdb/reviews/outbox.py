@@ -0,0 +1,137 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+metrics = {
+    'sent': 0,
+    'failed': 0,
+    'latency_seconds_sum': 0.0,
+    'latency_seconds_max': 0.0,
+}
+metrics_lock = threading.Lock()
+
+# Потоки пула создаются только при первой отправке.
+executor = ThreadPoolExecutor(
+    max_workers=settings.EMAIL_OUTBOX_THREADS,
+    thread_name_prefix='outbox'
+)
+
+
+def pending():
+    return OutgoingEmail.objects.filter(
+        sent__isnull=True,
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def queue_depth():
+    return pending().count()
+
+
+def backoff(attempts):
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def record(sent, failed, latencies):
+    with metrics_lock:
+        metrics['sent'] += sent
+        metrics['failed'] += failed
+        for latency in latencies:
+            metrics['latency_seconds_sum'] += latency
+            metrics['latency_seconds_max'] = max(
+                metrics['latency_seconds_max'], latency
+            )
+
+
+def fail(email, error):
+    email.last_error = str(error)
+    email.next_attempt = timezone.now() + backoff(email.attempts)
+
+
+def send_batch(emails):
+    latencies = []
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+    except Exception as error:
+        for email in emails:
+            fail(email, error)
+        return latencies
+    try:
+        for email in emails:
+            try:
+                mail_connection.send_messages([EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email,
+                    to=[email.recipient],
+                )])
+            except Exception as error:
+                fail(email, error)
+                continue
+            email.sent = timezone.now()
+            latencies.append((email.sent - email.created).total_seconds())
+    finally:
+        mail_connection.close()
+    return latencies
+
+
+def claim(batch_size):
+    # Короткая транзакция: строки откладываются на время отправки, чтобы
+    # другие отправители их не взяли, и блокировки сразу отпускаются.
+    with transaction.atomic():
+        emails = list(pending().filter(
+            next_attempt__lte=timezone.now()
+        ).select_for_update(skip_locked=True)[:batch_size])
+        lease = timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+        )
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt = lease
+        OutgoingEmail.objects.bulk_update(
+            emails, ['attempts', 'next_attempt']
+        )
+    return emails
+
+
+def deliver_pending(batch_size=None):
+    emails = claim(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0
+    latencies = send_batch(emails)
+    OutgoingEmail.objects.bulk_update(
+        emails, ['sent', 'last_error', 'next_attempt']
+    )
+    record(len(latencies), len(emails) - len(latencies), latencies)
+    return len(latencies)
+
+
+def drain():
+    try:
+        while deliver_pending():
+            pass
+    finally:
+        connection.close()
+
+
+def enqueue(subject, message, recipient_list, from_email=None):
+    OutgoingEmail.objects.bulk_create(
+        OutgoingEmail(
+            subject=subject,
+            body=message,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            recipient=recipient,
+        ) for recipient in recipient_list
+    )
+    if settings.EMAIL_OUTBOX_IN_PROCESS:
+        transaction.on_commit(lambda: executor.submit(drain))
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import connection
+
+from .models import Title
+
+
+def search_vector():
+    return (
+        SearchVector('name', weight='A', config=settings.SEARCH_CONFIG)
+        + SearchVector(
+            'description', weight='B', config=settings.SEARCH_CONFIG
+        )
+    )
+
+
+def update_search_vectors(**lookups):
+    if connection.vendor != 'postgresql':
+        return
+    Title.objects.filter(**lookups).update(search_vector=search_vector())
@@ -0,0 +1,123 @@
+import threading
+from collections import defaultdict
+from weakref import WeakValueDictionary
+
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from .aggregates import (apply_comment_delta, apply_review_delta,
+                         apply_stats_delta, rebuild_title_stats,
+                         recalculate_comment_counts, recalculate_ratings,
+                         touch_titles)
+from .models import Comments, Review, Title, TitleStats
+from .search import update_search_vectors
+
+# Удаляемые сейчас в этом потоке произведения и отзывы: при каскадном
+# удалении счётчики и версии удаляемого родителя не обновляются по разу на
+# каждую дочернюю строку. Слабые ссылки не дают записи пережить удаление,
+# прерванное ошибкой.
+deleting = threading.local()
+
+
+def deleting_objects(model):
+    if not hasattr(deleting, 'objects'):
+        deleting.objects = defaultdict(WeakValueDictionary)
+    return deleting.objects[model]
+
+
+@receiver(pre_delete, sender=Title)
+@receiver(pre_delete, sender=Review)
+def mark_deleting(sender, instance, **kwargs):
+    deleting_objects(sender)[instance.pk] = instance
+
+
+@receiver(post_delete, sender=Title)
+def unmark_deleting(sender, instance, **kwargs):
+    deleting_objects(sender).pop(instance.pk, None)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    if created:
+        apply_review_delta(instance.title_id, instance.score, 1)
+        apply_stats_delta(instance.title_id, {instance.score: 1})
+    elif instance.loaded_rating is None:
+        recalculate_ratings([instance.title_id])
+        rebuild_title_stats([instance.title_id])
+    else:
+        title_id, score = instance.loaded_rating
+        if title_id != instance.title_id:
+            apply_review_delta(title_id, -score, -1)
+            apply_stats_delta(title_id, {score: -1})
+            apply_review_delta(instance.title_id, instance.score, 1)
+            apply_stats_delta(instance.title_id, {instance.score: 1})
+        elif score != instance.score:
+            apply_review_delta(title_id, instance.score - score, 0)
+            apply_stats_delta(title_id, {score: -1, instance.score: 1})
+        else:
+            touch_titles(pk=title_id)
+    instance.loaded_rating = (instance.title_id, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    deleting_objects(Review).pop(instance.pk, None)
+    if instance.title_id in deleting_objects(Title):
+        return
+    apply_review_delta(instance.title_id, -instance.score, -1)
+    apply_stats_delta(instance.title_id, {instance.score: -1})
+
+
+@receiver(post_save, sender=Title)
+def create_title_stats(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        TitleStats.objects.get_or_create(title=instance)
+
+
+@receiver(post_save, sender=Comments)
+def update_comment_count_on_save(sender, instance, created, **kwargs):
+    if created:
+        apply_comment_delta(instance.review_id, 1)
+    elif instance.loaded_review_id is None:
+        recalculate_comment_counts([instance.review_id])
+    elif instance.loaded_review_id != instance.review_id:
+        apply_comment_delta(instance.loaded_review_id, -1)
+        apply_comment_delta(instance.review_id, 1)
+        touch_titles(reviews=instance.loaded_review_id)
+    instance.loaded_review_id = instance.review_id
+    touch_titles(reviews=instance.review_id)
+
+
+@receiver(post_delete, sender=Comments)
+def update_comment_count_on_delete(sender, instance, **kwargs):
+    # Отзыв удаляется вместе с комментариями: версию произведения поднимет
+    # удаление самого отзыва.
+    if instance.review_id in deleting_objects(Review):
+        return
+    apply_comment_delta(instance.review_id, -1)
+    touch_titles(reviews=instance.review_id)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_title_on_genres(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        touch_titles(pk=instance.pk)
+    elif pk_set:
+        touch_titles(pk__in=pk_set)
+
+
+@receiver(post_save, sender=Title)
+def touch_title_on_save(sender, instance, created, raw, **kwargs):
+    # Версия входит в ETag карточки произведения.
+    if not created and not raw:
+        touch_titles(pk=instance.pk)
+
+
+@receiver(post_save, sender=Title)
+def update_title_search_vector(sender, instance, update_fields, **kwargs):
+    if update_fields is None or {'name', 'description'} & set(update_fields):
+        update_search_vectors(pk=instance.pk)
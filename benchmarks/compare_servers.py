@@ -0,0 +1,97 @@
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+
+from http_load import run
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+MODES = {
+    'wsgi': 'gthread',
+    'asgi': 'uvicorn.workers.UvicornWorker',
+}
+PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/{title_id}/',
+    '/api/v1/titles/{title_id}/reviews/',
+)
+
+
+def wait_until_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+        try:
+            connection.request('GET', '/api/v1/')
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+        finally:
+            connection.close()
+    raise RuntimeError(f'Сервер на порту {port} не запустился')
+
+
+def serve(mode, port, workers):
+    environment = dict(
+        os.environ,
+        GUNICORN_WORKER_CLASS=MODES[mode],
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+        # Перезапуск воркера по max_requests рвёт keep-alive соединения.
+        GUNICORN_MAX_REQUESTS='0',
+    )
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+        cwd=PROJECT_DIR,
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Сравнение WSGI (gthread) и ASGI (uvicorn) под нагрузкой'
+    )
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--title-id', type=int, default=1)
+    parser.add_argument('-c', '--concurrency', type=int, default=64)
+    parser.add_argument('-d', '--duration', type=float, default=10)
+    parser.add_argument('-w', '--workers', type=int, default=2)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+    results = []
+    for mode in args.modes:
+        server = serve(mode, args.port, args.workers)
+        try:
+            wait_until_ready(args.port)
+            for path in PATHS:
+                url = f'http://127.0.0.1:{args.port}' + path.format(
+                    title_id=args.title_id
+                )
+                result = run(url, args.concurrency, args.duration)
+                result['mode'] = mode
+                results.append(result)
+        finally:
+            server.terminate()
+            server.wait()
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        print(
+            f'{result["mode"]:5} {result["url"]}: {result["rps"]} req/s, '
+            f'{result["errors"]} errors, p50 {result["p50_ms"]} ms, '
+            f'p99 {result["p99_ms"]} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(values, share):
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def milliseconds(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+class Client:
+
+    def __init__(self, url, headers, keepalive):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path += '?' + parts.query
+        self.headers = dict(headers)
+        self.keepalive = keepalive
+        if not keepalive:
+            self.headers['Connection'] = 'close'
+        self.connection = None
+
+    def request(self, path=None):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=30
+            )
+        try:
+            self.connection.request(
+                'GET', path or self.path, headers=self.headers
+            )
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if not self.keepalive or response.will_close:
+            self.close()
+        return response
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def worker(url, headers, keepalive, deadline, latencies, errors, lock):
+    client = Client(url, headers, keepalive)
+    own_latencies = []
+    own_errors = 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            status = client.request().status
+        except (OSError, http.client.HTTPException):
+            own_errors += 1
+            continue
+        if status >= 400:
+            own_errors += 1
+            continue
+        own_latencies.append(time.perf_counter() - started)
+    client.close()
+    with lock:
+        latencies.extend(own_latencies)
+        errors.append(own_errors)
+
+
+def run(url, concurrency, duration, headers=(), keepalive=True):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(url, headers, keepalive, deadline, latencies, errors, lock)
+        )
+        for _ in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return dict(
+        {'url': url, 'concurrency': concurrency, 'keepalive': keepalive},
+        **summarize(latencies, sum(errors), time.monotonic() - started)
+    )
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'seconds': round(elapsed, 3),
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1),
+        'mean_ms': milliseconds(
+            statistics.mean(latencies) if latencies else None
+        ),
+        'p50_ms': milliseconds(percentile(latencies, 0.5)),
+        'p95_ms': milliseconds(percentile(latencies, 0.95)),
+        'p99_ms': milliseconds(percentile(latencies, 0.99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Нагрузочный тест GET-запросов к API'
+    )
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('-d', '--duration', type=float, default=10)
+    parser.add_argument(
+        '-H', '--header', action='append', default=[],
+        help='Заголовок "Имя: значение", можно повторять'
+    )
+    parser.add_argument(
+        '--no-keepalive', action='store_true',
+        help='Новое TCP-соединение на каждый запрос'
+    )
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+    headers = [
+        tuple(part.strip() for part in header.split(':', 1))
+        for header in args.header
+    ]
+    for url in args.urls:
+        result = run(
+            url, args.concurrency, args.duration, headers,
+            keepalive=not args.no_keepalive
+        )
+        if args.json:
+            print(json.dumps(result))
+            continue
+        print(
+            f'{url}: {result["rps"]} req/s, {result["requests"]} ok, '
+            f'{result["errors"]} errors, p50 {result["p50_ms"]} ms, '
+            f'p95 {result["p95_ms"]} ms, p99 {result["p99_ms"]} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
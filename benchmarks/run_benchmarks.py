@@ -0,0 +1,305 @@
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+from http_load import Client, summarize
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), 'api_yamdb')
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+QUERIES = re.compile(r'desc="(\d+) queries"')
+SAMPLE_SIZE = 200
+ADMIN_USERNAME = 'bench_admin'
+
+# Имя, шаблон пути, нужен ли токен администратора.
+SCENARIOS = (
+    ('categories', '/api/v1/categories/', False),
+    ('genres', '/api/v1/genres/', False),
+    ('titles', '/api/v1/titles/', False),
+    ('titles_sparse', '/api/v1/titles/?fields=id,name,year,rating', False),
+    ('titles_filtered', '/api/v1/titles/?genre={genre}&year={year}', False),
+    ('titles_by_rating', '/api/v1/titles/?ordering=-rating', False),
+    ('titles_cursor', '/api/v1/titles/?pagination=cursor', False),
+    ('titles_search', '/api/v1/titles/?search={word}', False),
+    ('title', '/api/v1/titles/{title_id}/', False),
+    ('reviews', '/api/v1/titles/{title_id}/reviews/', False),
+    ('review', '/api/v1/titles/{title_id}/reviews/{review_id}/', False),
+    (
+        'comments',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        False
+    ),
+    ('users', '/api/v1/users/', True),
+    ('me', '/api/v1/users/me/', True),
+)
+
+
+def setup_django():
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    django.setup()
+
+
+def sample_ids(model, size):
+    from django.db.models import Max
+    top = model.objects.aggregate(top=Max('pk'))['top'] or 0
+    ids = [random.randint(1, top) for _ in range(size)] if top else []
+    return model.objects.filter(pk__in=ids)
+
+
+def build_context():
+    from api.authentication import token_for_user
+    from reviews.models import Genre, Review, Title, User
+
+    reviews = list(
+        sample_ids(Review, SAMPLE_SIZE).values_list('pk', 'title_id')
+    )
+    titles = list(sample_ids(Title, SAMPLE_SIZE).values_list('pk', 'year'))
+    if not reviews or not titles:
+        raise SystemExit(
+            'База пуста: заполните её командой seed_benchmark_data'
+        )
+    admin, _ = User.objects.get_or_create(
+        username=ADMIN_USERNAME,
+        defaults={'email': f'{ADMIN_USERNAME}@example.com',
+                  'role': User.ADMIN},
+    )
+    return {
+        'reviews': reviews,
+        'titles': titles,
+        'genres': list(Genre.objects.values_list('slug', flat=True)),
+        'token': str(token_for_user(admin)),
+    }
+
+
+def make_path(template, context, rng):
+    review_id, title_id = rng.choice(context['reviews'])
+    if '{review_id}' not in template:
+        title_id = rng.choice(context['titles'])[0]
+    return template.format(
+        title_id=title_id,
+        review_id=review_id,
+        genre=rng.choice(context['genres']) if context['genres'] else '',
+        year=rng.choice(context['titles'])[1],
+        word=quote('Произведение'),
+    )
+
+
+def inprocess_sender(headers):
+    from django.db import connections
+    from django.test import Client as DjangoClient
+    local = threading.local()
+
+    def send(path):
+        if not hasattr(local, 'client'):
+            local.client = DjangoClient(**{
+                'HTTP_' + name.upper().replace('-', '_'): value
+                for name, value in headers.items()
+            })
+        response = local.client.get(path)
+        return response.status_code, response.get('Server-Timing', '')
+
+    def close():
+        connections.close_all()
+    return send, close
+
+
+def http_sender(base_url, headers):
+    local = threading.local()
+
+    def send(path):
+        if not hasattr(local, 'client'):
+            local.client = Client(base_url, headers.items(), keepalive=True)
+        response = local.client.request(path)
+        return response.status, response.getheader('Server-Timing') or ''
+    return send, lambda: None
+
+
+def worker(send, close, template, context, deadline, seed, collected, lock):
+    rng = random.Random(seed)
+    latencies, queries, errors = [], [], 0
+    while time.monotonic() < deadline:
+        path = make_path(template, context, rng)
+        started = time.perf_counter()
+        try:
+            status, timing = send(path)
+        except OSError:
+            errors += 1
+            continue
+        if status >= 400:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+        match = QUERIES.search(timing)
+        if match:
+            queries.append(int(match.group(1)))
+    close()
+    with lock:
+        collected['latencies'] += latencies
+        collected['queries'] += queries
+        collected['errors'] += errors
+
+
+def run_scenario(sender, template, context, args):
+    send, close = sender
+    for index in range(args.warmup):
+        send(make_path(template, context, random.Random(index)))
+    collected = {'latencies': [], 'queries': [], 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(
+            send, close, template, context, deadline, index, collected, lock
+        ))
+        for index in range(args.concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result = summarize(
+        collected['latencies'], collected['errors'],
+        time.monotonic() - started
+    )
+    queries = collected['queries']
+    result['queries_per_request'] = (
+        round(sum(queries) / len(queries), 2) if queries else None
+    )
+    return result
+
+
+def row_counts():
+    from reviews.models import Comments, Review, Title, User
+    return {
+        model._meta.db_table: model.objects.count()
+        for model in (User, Title, Review, Comments)
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BENCHMARKS_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    context = build_context()
+    admin_headers = {'Authorization': f'Bearer {context["token"]}'}
+    if args.mode == 'inprocess':
+        # Число SQL-запросов берётся из заголовка Server-Timing.
+        settings.PERF_SAMPLE_RATE = 1.0
+        settings.PERF_SERVER_TIMING = True
+        senders = {
+            False: inprocess_sender({}),
+            True: inprocess_sender(admin_headers),
+        }
+    else:
+        senders = {
+            False: http_sender(args.base_url, {}),
+            True: http_sender(args.base_url, admin_headers),
+        }
+    results = {}
+    for name, template, admin in SCENARIOS:
+        if args.only and name not in args.only:
+            continue
+        results[name] = run_scenario(
+            senders[admin], template, context, args
+        )
+        print_result(name, results[name])
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'mode': args.mode,
+            'database': connection.vendor,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'rows': row_counts(),
+        },
+        'scenarios': results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json'
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as result_file:
+        json.dump(report, result_file, ensure_ascii=False, indent=2)
+    print(f'Результаты сохранены в {output}')
+
+
+def print_result(name, result):
+    print(
+        f'{name:18} {result["rps"]:>8} req/s  p50 {result["p50_ms"]} ms  '
+        f'p95 {result["p95_ms"]} ms  p99 {result["p99_ms"]} ms  '
+        f'{result["queries_per_request"]} SQL/запрос  '
+        f'{result["errors"]} ошибок'
+    )
+
+
+def change(old, new):
+    if old in (None, 0) or new is None:
+        return ''
+    return f' ({(new - old) / old * 100:+.1f}%)'
+
+
+def compare(args):
+    with open(args.base, encoding='utf-8') as base_file:
+        base = json.load(base_file)['scenarios']
+    with open(args.new, encoding='utf-8') as new_file:
+        new = json.load(new_file)['scenarios']
+    for name in sorted(base.keys() & new.keys()):
+        old_result, new_result = base[name], new[name]
+        print(f'{name}:')
+        for field in ('rps', 'p50_ms', 'p95_ms', 'p99_ms',
+                      'queries_per_request'):
+            print(
+                f'  {field:20} {old_result[field]} -> {new_result[field]}'
+                f'{change(old_result[field], new_result[field])}'
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замеры API YaMDb')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='Запустить замеры')
+    run_parser.add_argument(
+        '--mode', choices=('inprocess', 'http'), default='inprocess',
+        help='inprocess - тестовый клиент Django в этом процессе, '
+             'http - запущенный сервер по --base-url'
+    )
+    run_parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    run_parser.add_argument('-c', '--concurrency', type=int, default=4)
+    run_parser.add_argument('-d', '--duration', type=float, default=10)
+    run_parser.add_argument('--warmup', type=int, default=10)
+    run_parser.add_argument('--only', nargs='+', default=None)
+    run_parser.add_argument('-o', '--output', default=None)
+    run_parser.set_defaults(handler=run)
+    compare_parser = commands.add_parser(
+        'compare', help='Сравнить два файла результатов'
+    )
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.set_defaults(handler=compare)
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
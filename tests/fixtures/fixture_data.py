@@ -0,0 +1,94 @@
+import pytest
+
+OBJECTS_COUNT = 20
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create(
+        username='TestAdmin',
+        email='testadmin@yamdb.fake',
+        role='admin',
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+
+    from api.authentication import token_for_user
+
+    client = APIClient()
+    token = token_for_user(admin)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture
+def users(django_user_model):
+    return [
+        django_user_model.objects.create(
+            username=f'TestUser{number}',
+            email=f'testuser{number}@yamdb.fake',
+        ) for number in range(OBJECTS_COUNT)
+    ]
+
+
+@pytest.fixture
+def titles():
+    from reviews.models import Category, Genre, Title
+
+    categories = [
+        Category.objects.create(name=f'Категория {number}',
+                                slug=f'category-{number}')
+        for number in range(OBJECTS_COUNT)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+        for number in range(OBJECTS_COUNT)
+    ]
+    titles = []
+    for number, category in enumerate(categories):
+        title = Title.objects.create(
+            name=f'Произведение {number}',
+            year=2000 + number,
+            category=category,
+            description='Описание',
+        )
+        title.genre.set(genres[number:number + 2])
+        titles.append(title)
+    return titles
+
+
+@pytest.fixture
+def reviews(titles, users):
+    from reviews.models import Review
+
+    return [
+        Review.objects.create(
+            title=titles[0],
+            author=user,
+            text=f'Отзыв {number}',
+            score=number % 10 + 1,
+        ) for number, user in enumerate(users)
+    ]
+
+
+@pytest.fixture
+def comments(reviews, users):
+    from reviews.models import Comments
+
+    return [
+        Comments.objects.create(
+            review=reviews[0],
+            author=user,
+            text=f'Комментарий {number}',
+        ) for number, user in enumerate(users)
+    ]
@@ -0,0 +1,90 @@
+import pytest
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from api.queries import QueryAudit
+
+API_NAMESPACE = 'api'
+MARKER = 'no_query_audit'
+
+
+def pytest_addoption(parser):
+    parser.addini(
+        'query_audit_repeat_threshold',
+        'Сколько одинаковых по форме SQL за запрос к API считать N+1'
+    )
+    parser.addini(
+        'query_audit_slow_ms',
+        'Порог медленного SQL в запросе к API, мс'
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', f'{MARKER}: не проверять SQL запросов к API в тесте'
+    )
+
+
+def ini_int(config, name, default):
+    value = config.getini(name)
+    return int(value) if value else default
+
+
+class RequestAuditor:
+
+    def __init__(self, config):
+        self.repeat_threshold = ini_int(
+            config, 'query_audit_repeat_threshold',
+            settings.QUERY_AUDIT_REPEAT_THRESHOLD
+        )
+        self.slow_ms = ini_int(
+            config, 'query_audit_slow_ms', settings.QUERY_AUDIT_SLOW_MS
+        )
+        self.current = None
+        self.reports = []
+
+    def started(self, sender, environ, **kwargs):
+        path = environ.get('PATH_INFO', '')
+        try:
+            if resolve(path).namespace != API_NAMESPACE:
+                return
+        except Resolver404:
+            return
+        audit = QueryAudit()
+        self.current = (f'{environ["REQUEST_METHOD"]} {path}', audit)
+        for connection in connections.all():
+            connection.execute_wrappers.append(audit)
+
+    def finished(self, sender, **kwargs):
+        if self.current is None:
+            return
+        request, audit = self.current
+        self.current = None
+        for connection in connections.all():
+            if audit in connection.execute_wrappers:
+                connection.execute_wrappers.remove(audit)
+        problems = audit.problems(self.repeat_threshold, self.slow_ms)
+        if problems:
+            self.reports.append(f'{request}:\n  ' + '\n  '.join(problems))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    if item.get_closest_marker(MARKER):
+        yield
+        return
+    auditor = RequestAuditor(item.config)
+    request_started.connect(auditor.started)
+    request_finished.connect(auditor.finished)
+    try:
+        outcome = yield
+    finally:
+        request_started.disconnect(auditor.started)
+        request_finished.disconnect(auditor.finished)
+    if auditor.reports and outcome.excinfo is None:
+        pytest.fail(
+            'N+1 или медленные запросы к БД:\n' + '\n'.join(auditor.reports),
+            pytrace=False
+        )
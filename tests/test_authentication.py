@@ -0,0 +1,31 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestClaimsAuthentication:
+
+    def test_local_cache_loads_user(self, admin, settings):
+        from api.authentication import ClaimsJWTAuthentication, token_for_user
+
+        settings.JWT_TRUST_CLAIMS = False
+        user = ClaimsJWTAuthentication().get_user(token_for_user(admin))
+        assert not getattr(user, 'from_token', False), (
+            'Без общего кэша пользователь должен читаться из БД'
+        )
+        assert user.role == admin.role
+
+    def test_changed_user_not_trusted(self, admin, settings):
+        from api.authentication import ClaimsJWTAuthentication, token_for_user
+
+        settings.JWT_TRUST_CLAIMS = True
+        token = token_for_user(admin)
+        authentication = ClaimsJWTAuthentication()
+        assert authentication.get_user(token).from_token
+        admin.role = admin.USER
+        admin.save()
+        user = authentication.get_user(token)
+        assert not getattr(user, 'from_token', False), (
+            'После изменения пользователя claims старого токена '
+            'не должны приниматься'
+        )
+        assert user.role == admin.USER
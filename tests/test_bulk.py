@@ -0,0 +1,144 @@
+import pytest
+
+BULK_REVIEWS_URL = '/api/v1/reviews/bulk/'
+
+
+@pytest.mark.django_db
+class TestBulkReviews:
+
+    def test_parallel_duplicate(self, admin_client, users, titles,
+                                monkeypatch):
+        from api import bulk
+        from api.serializers import DUPLICATE_REVIEW
+        from reviews.models import Review
+
+        title = titles[1]
+        chunks = bulk.chunks
+
+        def chunks_after_parallel_review(items, size):
+            # Отзыв появился после проверки дублей, но до вставки пачки.
+            Review.objects.create(
+                title=title, author=users[0], text='Параллельный', score=1
+            )
+            return chunks(items, size)
+
+        monkeypatch.setattr(bulk, 'chunks', chunks_after_parallel_review)
+        response = admin_client.post(BULK_REVIEWS_URL, [
+            {'title': title.pk, 'author': user.username,
+             'text': 'Текст', 'score': 10}
+            for user in users[:2]
+        ], format='json')
+        assert response.status_code == 201
+        duplicate, created = response.json()['results']
+        assert duplicate['errors'] == {'non_field_errors': [DUPLICATE_REVIEW]}
+        assert created['id'] == Review.objects.get(
+            title=title, author=users[1]
+        ).pk, 'В результате должен быть id созданного отзыва'
+        title.refresh_from_db()
+        assert title.review_count == 2, (
+            'Счётчик отзывов должен учитывать только вставленные строки'
+        )
+        assert title.stats.score_10 == 1
+
+
+BULK_TITLES_URL = '/api/v1/titles/bulk/'
+
+
+@pytest.mark.django_db
+class TestBulkTitles:
+
+    def post(self, client, items):
+        response = client.post(BULK_TITLES_URL, items, format='json')
+        assert response.status_code in (200, 201)
+        return [result['status'] for result in response.json()['results']]
+
+    def test_upsert(self, admin_client, titles):
+        from reviews.models import Title
+
+        item = {
+            'name': 'Новое', 'year': 2001, 'description': 'Описание',
+            'category': 'category-0', 'genre': ['genre-0', 'genre-1'],
+        }
+        existing = {
+            'name': titles[0].name, 'year': titles[0].year,
+            'description': titles[0].description,
+            'category': titles[0].category.slug,
+            'genre': sorted(
+                genre.slug for genre in titles[0].genre.all()
+            ),
+        }
+        assert self.post(admin_client, [item, existing]) == [
+            'created', 'unchanged'
+        ]
+        title = Title.objects.get(name='Новое', year=2001)
+        assert {genre.slug for genre in title.genre.all()} == {
+            'genre-0', 'genre-1'
+        }
+        assert self.post(admin_client, [item]) == ['unchanged']
+
+        item['genre'] = ['genre-1', 'genre-2']
+        assert self.post(admin_client, [item]) == ['updated'], (
+            'Изменение жанров должно обновлять произведение'
+        )
+        assert {genre.slug for genre in title.genre.all()} == {
+            'genre-1', 'genre-2'
+        }, 'Лишний жанр должен удаляться, новый - добавляться'
+
+        item['description'] = 'Другое описание'
+        assert self.post(admin_client, [item]) == ['updated']
+        title.refresh_from_db()
+        assert title.description == 'Другое описание'
+        assert Title.objects.filter(name='Новое').count() == 1
+
+    def test_errors(self, admin_client, titles):
+        item = {
+            'name': 'Новое', 'year': 2001, 'description': 'Описание',
+            'category': 'unknown', 'genre': ['genre-0', 'unknown'],
+        }
+        response = admin_client.post(
+            BULK_TITLES_URL, [item, dict(item, category='category-0')],
+            format='json'
+        )
+        assert response.status_code == 400
+        first, second = response.json()['results']
+        assert set(first['errors']) == {'category', 'genre'}
+        assert set(second['errors']) == {'genre'}
+
+    def test_command(self, titles, tmp_path):
+        import json
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        path = tmp_path / 'titles.ndjson'
+        path.write_text('\n'.join(json.dumps(item) for item in [
+            {'name': 'Новое', 'year': 2001, 'description': 'Описание',
+             'category': 'category-0', 'genre': ['genre-0']},
+            {'name': 'Ошибка', 'year': 2001, 'description': 'Описание',
+             'category': 'unknown', 'genre': []},
+        ]), encoding='utf-8')
+        stdout = StringIO()
+        call_command('upsert_titles', str(path), stdout=stdout,
+                     stderr=StringIO())
+        assert stdout.getvalue().split('\n')[:2] == ['created: 1', 'error: 1']
+
+
+@pytest.mark.django_db
+class TestBulkValidation:
+
+    @pytest.mark.parametrize(
+        'url', [BULK_REVIEWS_URL, BULK_TITLES_URL, '/api/v1/comments/bulk/']
+    )
+    def test_empty_list(self, admin_client, url):
+        response = admin_client.post(url, [], format='json')
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': ['Список пуст.']}
+
+    @pytest.mark.parametrize('score', [0, 11])
+    def test_score_range(self, admin_client, titles, users, score):
+        response = admin_client.post(BULK_REVIEWS_URL, [{
+            'title': titles[0].pk, 'author': users[0].username,
+            'text': 'Текст', 'score': score,
+        }], format='json')
+        assert response.status_code == 400
+        assert 'score' in response.json()['results'][0]['errors']
@@ -0,0 +1,42 @@
+import pytest
+
+CATEGORIES_URL = '/api/v1/categories/'
+
+
+# Кэш сбрасывается в transaction.on_commit: нужны настоящие транзакции.
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    def test_list_invalidated_on_create(self, client, admin_client, titles):
+        from api.cache import CACHE_HEADER
+
+        first = client.get(CATEGORIES_URL)
+        second = client.get(CATEGORIES_URL)
+        assert first[CACHE_HEADER] == 'MISS'
+        assert second[CACHE_HEADER] == 'HIT', (
+            'Повторный запрос списка должен отдаваться из кэша'
+        )
+        response = admin_client.post(
+            CATEGORIES_URL, {'name': 'Новая', 'slug': 'new'}, format='json'
+        )
+        assert response.status_code == 201
+        third = client.get(CATEGORIES_URL)
+        assert third[CACHE_HEADER] == 'MISS', (
+            'Создание категории должно сбрасывать кэш списка'
+        )
+        assert third.json()['count'] == first.json()['count'] + 1
+
+    def test_stats_counted_in_process(self, client, settings):
+        from django.core.cache import cache
+
+        from api.cache import STATS_KEY, cache_stats, stats
+
+        settings.API_CACHE_STATS_INTERVAL = 60 * 60
+        stats.flush()
+        cache.clear()
+        client.get(CATEGORIES_URL)
+        client.get(CATEGORIES_URL)
+        assert cache.get(STATS_KEY.format(counter='hits')) is None, (
+            'Статистика не должна писаться в кэш на каждом запросе'
+        )
+        assert cache_stats() == {'hits': 1, 'misses': 1}
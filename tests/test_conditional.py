@@ -0,0 +1,43 @@
+import pytest
+
+
+# Кэш ответов сбрасывается в transaction.on_commit.
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    def test_title_patch_changes_etag(self, client, admin_client, titles):
+        url = f'/api/v1/titles/{titles[0].pk}/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        response = admin_client.patch(
+            url, {'name': 'Новое название'}, format='json'
+        )
+        assert response.status_code == 200
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'После изменения произведения старый ETag не должен давать 304'
+        )
+        assert response.json()['name'] == 'Новое название'
+        assert response['ETag'] != etag
+
+    def test_non_numeric_pk(self, client, titles):
+        assert client.get('/api/v1/titles/abc/').status_code == 404
+
+    def test_stale_save_keeps_version(self, client, titles, users):
+        from reviews.models import Review, Title
+
+        url = f'/api/v1/titles/{titles[0].pk}/'
+        stale = Title.objects.get(pk=titles[0].pk)
+        Review.objects.create(
+            title=titles[0], author=users[0], text='Отзыв', score=5
+        )
+        etag = client.get(url)['ETag']
+        stale.description = 'Новое описание'
+        stale.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Сохранение устаревшего объекта не должно возвращать версию '
+            'назад и повторно выдавать старый ETag'
+        )
+        assert response.json()['rating'] == 5
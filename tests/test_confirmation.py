@@ -0,0 +1,60 @@
+import pytest
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def signed(settings):
+    settings.CONFIRMATION_CODE_MODE = 'signed'
+    settings.CONFIRMATION_CODE_SECRETS = ['new-secret']
+    settings.EMAIL_OUTBOX_IN_PROCESS = False
+    return settings
+
+
+@pytest.mark.django_db
+class TestSignedCode:
+
+    def test_reissue(self, client, signed):
+        from reviews.models import OutgoingEmail
+
+        user = {'username': 'reader', 'email': 'reader@yamdb.fake'}
+        codes = []
+        for _ in range(2):
+            assert client.post(SIGNUP_URL, user).status_code == 200
+            code = OutgoingEmail.objects.latest('pk').body.split()[-1]
+            response = client.post(TOKEN_URL, {
+                'username': user['username'], 'confirmation_code': code
+            })
+            assert response.status_code == 200, (
+                'Код повторной регистрации должен приниматься'
+            )
+            codes.append(code)
+        assert codes[0] != codes[1]
+
+    def test_replay(self, admin, signed):
+        from api.confirmation import check_code, issue_code
+
+        old = issue_code(admin)
+        code = issue_code(admin)
+        assert check_code(admin, code)
+        assert not check_code(admin, code), (
+            'Использованный код не должен приниматься повторно'
+        )
+        assert not check_code(admin, old), (
+            'После выдачи нового кода старый недействителен'
+        )
+
+    def test_secret_rotation(self, admin, signed):
+        from api.confirmation import check_code, issue_code
+
+        signed.CONFIRMATION_CODE_SECRETS = ['old-secret']
+        code = issue_code(admin)
+        signed.CONFIRMATION_CODE_SECRETS = ['new-secret', 'old-secret']
+        assert check_code(admin, code), (
+            'Код, подписанный прежним секретом, принимается при ротации'
+        )
+        signed.CONFIRMATION_CODE_SECRETS = ['old-secret']
+        code = issue_code(admin)
+        signed.CONFIRMATION_CODE_SECRETS = ['new-secret']
+        assert not check_code(admin, code)
@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestConnectionHealthChecks:
+
+    def checks(self, monkeypatch, idle):
+        from django.core.signals import request_finished, request_started
+        from django.db import connection
+
+        connection.ensure_connection()
+        calls = []
+        monkeypatch.setattr(
+            connection, 'is_usable', lambda: calls.append(True) or True
+        )
+        request_finished.send(sender=None)
+        monkeypatch.setattr(
+            'api.signals.time.monotonic',
+            lambda: connection.request_finished_at + idle
+        )
+        request_started.send(sender=None, environ={})
+        return len(calls)
+
+    def test_recent_connection_not_checked(self, monkeypatch, settings):
+        settings.DB_CONN_HEALTH_CHECK_IDLE = 30
+        assert self.checks(monkeypatch, 1) == 0, (
+            'Соединение сразу после запроса не должно проверяться SELECT 1'
+        )
+
+    def test_idle_connection_checked(self, monkeypatch, settings):
+        settings.DB_CONN_HEALTH_CHECK_IDLE = 30
+        assert self.checks(monkeypatch, 31) == 1
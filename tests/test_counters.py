@@ -0,0 +1,110 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestCascadeCounters:
+
+    def test_review_delete(self, titles, reviews, comments):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.aggregates import (rebuild_title_stats,
+                                        recalculate_comment_counts,
+                                        recalculate_ratings)
+
+        title = titles[0]
+        version = title.version
+        with CaptureQueriesContext(connection) as context:
+            reviews[0].delete()
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        assert len(updates) < len(comments), (
+            'Каскадное удаление комментариев не должно обновлять '
+            'отзыв и произведение по разу на каждую строку'
+        )
+        title.refresh_from_db()
+        assert title.version > version
+        assert title.review_count == len(reviews) - 1
+        assert recalculate_ratings() == 0
+        assert recalculate_comment_counts() == 0
+        assert rebuild_title_stats() == 0, (
+            'После каскадного удаления счётчики должны совпадать с таблицами'
+        )
+
+    def test_title_delete(self, titles, reviews, comments):
+        from reviews.aggregates import recalculate_comment_counts
+        from reviews.models import Comments, Review
+
+        titles[0].delete()
+        assert not Review.objects.exists()
+        assert not Comments.objects.exists()
+        assert recalculate_comment_counts() == 0
+
+    def test_comment_delete(self, titles, reviews, comments):
+        reviews[0].refresh_from_db()
+        count = reviews[0].comment_count
+        comments[0].delete()
+        reviews[0].refresh_from_db()
+        assert reviews[0].comment_count == count - 1
+
+
+@pytest.mark.django_db
+class TestStaleSave:
+
+    def test_title_save_keeps_counters(self, titles, users):
+        from reviews.aggregates import recalculate_ratings
+        from reviews.models import Review, Title
+
+        stale = Title.objects.get(pk=titles[0].pk)
+        Review.objects.create(
+            title=titles[0], author=users[0], text='Отзыв', score=7
+        )
+        fresh = Title.objects.get(pk=titles[0].pk)
+        stale.description = 'Новое описание'
+        stale.save()
+        title = Title.objects.get(pk=titles[0].pk)
+        assert title.description == 'Новое описание'
+        assert title.review_count == 1, (
+            'Сохранение устаревшего объекта не должно затирать счётчики'
+        )
+        assert title.rating == 7
+        assert title.version > fresh.version, (
+            'Версия произведения не должна уменьшаться'
+        )
+        assert recalculate_ratings() == 0
+
+    def test_review_save_keeps_comment_count(self, reviews, users):
+        from reviews.aggregates import recalculate_comment_counts
+        from reviews.models import Comments, Review
+
+        stale = Review.objects.get(pk=reviews[0].pk)
+        Comments.objects.create(
+            review=reviews[0], author=users[0], text='Комментарий'
+        )
+        stale.text = 'Новый текст'
+        stale.save()
+        assert Review.objects.get(pk=reviews[0].pk).comment_count == 1
+        assert recalculate_comment_counts() == 0
+
+
+@pytest.mark.django_db
+class TestRecalculate:
+
+    def test_comment_counts_single_update(self, reviews, comments):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.aggregates import recalculate_comment_counts
+        from reviews.models import Review
+
+        Review.objects.update(comment_count=0)
+        with CaptureQueriesContext(connection) as context:
+            assert recalculate_comment_counts() == 1
+        assert len(context.captured_queries) == 1, (
+            'Пересчёт должен выполняться одним UPDATE без списка id'
+        )
+        assert Review.objects.get(pk=reviews[0].pk).comment_count == len(
+            comments
+        )
+        assert recalculate_comment_counts([reviews[0].pk]) == 0
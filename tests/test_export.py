@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+
+EXPORT_URL = '/api/v1/export/{dataset}/'
+
+
+def read_stream(response):
+    assert response.status_code == 200
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_titles_csv(self, admin_client, titles):
+        response = admin_client.get(EXPORT_URL.format(dataset='titles'))
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert [int(row['id']) for row in rows] == [
+            title.pk for title in titles
+        ]
+        for row, title in zip(rows, titles):
+            assert row['name'] == title.name
+            assert int(row['year']) == title.year
+            assert row['category'] == title.category.slug
+            assert set(row['genre'].split()) == {
+                genre.slug for genre in title.genre.all()
+            }, 'Жанры произведения должны выгружаться через пробел'
+
+    def test_reviews_ndjson_since(self, admin_client, reviews):
+        from django.utils import timezone
+        from django.utils.dateparse import parse_datetime
+
+        from reviews.models import Review
+
+        old = timezone.now() - timedelta(days=30)
+        Review.objects.filter(
+            pk__in=[review.pk for review in reviews[:5]]
+        ).update(pub_date=old)
+        since = (old + timedelta(days=1)).date().isoformat()
+        response = admin_client.get(
+            EXPORT_URL.format(dataset='reviews'),
+            {'output': 'ndjson', 'since': since}
+        )
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        lines = [
+            json.loads(line) for line in read_stream(response).splitlines()
+        ]
+        assert [line['id'] for line in lines] == [
+            review.pk for review in reviews[5:]
+        ], 'since= должен отбрасывать более старые отзывы'
+        review = Review.objects.get(pk=lines[0]['id'])
+        assert lines[0]['text'] == review.text
+        assert lines[0]['score'] == review.score
+        assert parse_datetime(lines[0]['pub_date']) == review.pub_date
+
+    @pytest.mark.parametrize('params', [
+        {'since': 'вчера'}, {'output': 'xml'},
+    ])
+    def test_bad_params(self, admin_client, params):
+        response = admin_client.get(
+            EXPORT_URL.format(dataset='reviews'), params
+        )
+        assert response.status_code == 400
+
+    def test_admin_only(self, client):
+        response = client.get(EXPORT_URL.format(dataset='reviews'))
+        assert response.status_code == 401
@@ -0,0 +1,48 @@
+import pytest
+
+TOP_URL = '/api/v1/leaderboards/top/'
+
+
+def ranked_ids(client, url=TOP_URL):
+    response = client.get(url)
+    assert response.status_code == 200
+    return [
+        ranking['title']['id'] for ranking in response.json()['results']
+    ]
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    def test_top(self, client, titles, users, reviews):
+        from reviews.leaderboards import refresh_leaderboards
+        from reviews.models import Review
+
+        # У titles[0] 20 отзывов со средней 5.5: одна десятка и одна
+        # единица весят меньше, чем двадцать средних оценок.
+        Review.objects.create(
+            title=titles[1], author=users[0], text='Отзыв', score=10
+        )
+        Review.objects.create(
+            title=titles[2], author=users[0], text='Отзыв', score=1
+        )
+        refresh_leaderboards(full=True)
+        assert ranked_ids(client) == [
+            titles[1].pk, titles[0].pk, titles[2].pk
+        ]
+        assert ranked_ids(client, f'{TOP_URL}?genre=genre-1') == [
+            titles[1].pk, titles[0].pk
+        ], 'Таблица жанра должна содержать только произведения жанра'
+
+        for user in users[1:6]:
+            Review.objects.create(
+                title=titles[2], author=user, text='Отзыв', score=10
+            )
+        refresh_leaderboards()
+        assert ranked_ids(client) == [
+            titles[2].pk, titles[1].pk, titles[0].pk
+        ], 'Обновление должно пересчитать изменившиеся таблицы'
+
+    def test_unknown_scope(self, client, titles):
+        response = client.get(f'{TOP_URL}?genre=unknown')
+        assert response.status_code == 404
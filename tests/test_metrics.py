@@ -0,0 +1,23 @@
+import pytest
+
+CATEGORIES_URL = '/api/v1/categories/'
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+
+    def test_off_by_default(self, client, settings):
+        from api.middleware import SERVER_TIMING_HEADER
+
+        settings.PERF_SAMPLE_RATE = 1.0
+        assert not client.get(CATEGORIES_URL).has_header(
+            SERVER_TIMING_HEADER
+        ), 'Server-Timing не должен отдаваться без DEBUG'
+
+    def test_enabled(self, client, settings):
+        from api.middleware import SERVER_TIMING_HEADER
+
+        settings.PERF_SAMPLE_RATE = 1.0
+        settings.PERF_SERVER_TIMING = True
+        response = client.get(CATEGORIES_URL)
+        assert 'db;dur=' in response[SERVER_TIMING_HEADER]
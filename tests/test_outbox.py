@@ -0,0 +1,58 @@
+import pytest
+
+
+# Отправка проверяется вне транзакции: нужны настоящие транзакции.
+@pytest.mark.django_db(transaction=True)
+class TestOutbox:
+
+    def test_sent_outside_transaction(self, settings, monkeypatch,
+                                      mailoutbox):
+        from django.core.mail.backends.locmem import EmailBackend
+        from django.db import connection
+        from reviews import outbox
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_IN_PROCESS = False
+        in_transaction = []
+        send_messages = EmailBackend.send_messages
+
+        def spy(backend, messages):
+            in_transaction.append(connection.in_atomic_block)
+            return send_messages(backend, messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', spy)
+        outbox.enqueue('Тема', 'Текст', ['a@yamdb.fake', 'b@yamdb.fake'])
+        assert outbox.deliver_pending() == 2
+        assert len(mailoutbox) == 2
+        assert in_transaction == [False, False], (
+            'Письма должны отправляться вне транзакции захвата'
+        )
+        assert not OutgoingEmail.objects.filter(sent__isnull=True).exists()
+        assert set(
+            OutgoingEmail.objects.values_list('attempts', flat=True)
+        ) == {1}
+
+    def test_failed_send_retried_later(self, settings, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+        from django.utils import timezone
+        from reviews import outbox
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_IN_PROCESS = False
+
+        def broken(backend, messages):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', broken)
+        outbox.enqueue('Тема', 'Текст', ['a@yamdb.fake'])
+        assert outbox.deliver_pending() == 0
+        email = OutgoingEmail.objects.get()
+        assert email.sent is None
+        assert email.attempts == 1
+        assert email.last_error == 'SMTP недоступен'
+        assert email.next_attempt > timezone.now(), (
+            'Неудачное письмо должно быть отложено на время backoff'
+        )
+        assert outbox.deliver_pending() == 0, (
+            'Отложенное письмо не должно отправляться повторно сразу'
+        )
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+import pytest
+
+PAGE_SIZE = 2
+REVIEWS_COUNT = 6
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_equal_timestamps(self, client, reviews, monkeypatch):
+        from django.utils import timezone
+
+        from api.pagination import PageNumberOrKeysetPagination
+        from reviews.models import Review
+
+        monkeypatch.setattr(
+            PageNumberOrKeysetPagination, 'page_size', PAGE_SIZE
+        )
+        title_id = reviews[0].title_id
+        Review.objects.filter(title_id=title_id).delete()
+        # Одна миллисекунда, микросекунды различаются и совпадают попарно.
+        moment = timezone.now().replace(microsecond=123000)
+        expected = []
+        for number, review in enumerate(reviews[:REVIEWS_COUNT]):
+            review.pk = None
+            review.save()
+            Review.objects.filter(pk=review.pk).update(
+                pub_date=moment + timedelta(microseconds=number // 2)
+            )
+            expected.append(review.pk)
+        url = f'/api/v1/titles/{title_id}/reviews/?pagination=cursor'
+        received = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            received += [review['id'] for review in data['results']]
+            url = data['next']
+        assert received == sorted(expected, reverse=True), (
+            'Проход по курсору должен вернуть все отзывы без пропусков '
+            'и повторов, даже если время публикации совпадает'
+        )
+
+    def test_ordering_rejected(self, client, titles):
+        response = client.get(
+            '/api/v1/titles/?pagination=cursor&ordering=rating'
+        )
+        assert response.status_code == 400, (
+            'Курсорная пагинация не должна молча игнорировать ?ordering='
+        )
+        assert 'ordering' in response.json()
@@ -0,0 +1,31 @@
+from api.queries import QueryAudit, normalize
+
+
+def execute(sql, params, many, context):
+    return None
+
+
+class TestQueryAudit:
+
+    def test_normalize(self):
+        assert normalize(
+            'SELECT * FROM t WHERE id = 15 AND name = \'a\'\n'
+            'AND pk IN (%s, %s, %s)'
+        ) == normalize(
+            'SELECT * FROM t WHERE id = 7 AND name = \'b\' AND pk IN (%s)'
+        ), 'Запросы одной формы должны нормализоваться одинаково'
+
+    def test_repeated_queries(self, settings):
+        settings.QUERY_AUDIT_REPEAT_THRESHOLD = 3
+        audit = QueryAudit()
+        for pk in range(3):
+            audit(execute, f'SELECT * FROM t WHERE id = {pk}', (), False, {})
+        audit(execute, 'SAVEPOINT "s1"', (), False, {})
+        audit(execute, 'SAVEPOINT "s2"', (), False, {})
+        audit(execute, 'SAVEPOINT "s3"', (), False, {})
+        problems = audit.problems()
+        assert len(problems) == 1, (
+            'Повторяющийся запрос должен попадать в отчёт, '
+            'служебные SAVEPOINT - нет'
+        )
+        assert problems[0].startswith('3 повторов')
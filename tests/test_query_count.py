@@ -0,0 +1,45 @@
+import pytest
+
+MAX_LIST_QUERIES = 3
+
+
+@pytest.mark.django_db
+class TestListQueryCount:
+
+    def check_queries(self, client, url, django_assert_max_num_queries):
+        with django_assert_max_num_queries(MAX_LIST_QUERIES):
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+        )
+        return response
+
+    def test_titles_list(self, client, titles,
+                         django_assert_max_num_queries):
+        self.check_queries(
+            client, '/api/v1/titles/', django_assert_max_num_queries
+        )
+
+    def test_reviews_list(self, client, reviews,
+                          django_assert_max_num_queries):
+        title_id = reviews[0].title_id
+        self.check_queries(
+            client,
+            f'/api/v1/titles/{title_id}/reviews/',
+            django_assert_max_num_queries
+        )
+
+    def test_comments_list(self, client, comments,
+                           django_assert_max_num_queries):
+        review = comments[0].review
+        self.check_queries(
+            client,
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/',
+            django_assert_max_num_queries
+        )
+
+    def test_users_list(self, admin_client, users,
+                        django_assert_max_num_queries):
+        self.check_queries(
+            admin_client, '/api/v1/users/', django_assert_max_num_queries
+        )
@@ -0,0 +1,58 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestReviewCreate:
+
+    def test_duplicate(self, titles, users):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from rest_framework.test import APIClient
+
+        from api.authentication import token_for_user
+        from api.serializers import DUPLICATE_REVIEW
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {token_for_user(users[0])}'
+        )
+        url = f'/api/v1/titles/{titles[0].pk}/reviews/'
+        data = {'text': 'Отзыв', 'score': 5}
+        assert client.post(url, data, format='json').status_code == 201
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, data, format='json')
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': [DUPLICATE_REVIEW]}
+        queries = [query['sql'] for query in context.captured_queries]
+        insert = next(
+            number for number, sql in enumerate(queries)
+            if sql.startswith('INSERT INTO "reviews_review"')
+        )
+        lookups = [
+            sql for sql in queries[insert + 1:]
+            if sql.startswith('SELECT') and '"reviews_review"' in sql
+        ]
+        assert len(lookups) == 1, (
+            'Дубликат должен проверяться одним запросом после ошибки вставки'
+        )
+
+    def test_other_integrity_error(self, titles, users, monkeypatch):
+        from django.db import IntegrityError
+        from rest_framework.test import APIClient
+
+        from api.authentication import token_for_user
+        from api.serializers import ReviewSerializer
+
+        def broken_save(serializer, **kwargs):
+            raise IntegrityError('FOREIGN KEY constraint failed')
+
+        monkeypatch.setattr(ReviewSerializer, 'save', broken_save)
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {token_for_user(users[0])}'
+        )
+        with pytest.raises(IntegrityError):
+            client.post(
+                f'/api/v1/titles/{titles[0].pk}/reviews/',
+                {'text': 'Отзыв', 'score': 5}, format='json'
+            )
@@ -0,0 +1,57 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def found_ids(client, params):
+    response = client.get(TITLES_URL, params)
+    assert response.status_code == 200
+    return [title['id'] for title in response.json()['results']]
+
+
+# Индекс поиска без PostgreSQL перестраивается по версии кэша, которая
+# сбрасывается в transaction.on_commit.
+@pytest.mark.django_db(transaction=True)
+class TestSearch:
+
+    @pytest.fixture
+    def library(self, titles):
+        from reviews.models import Title
+
+        Title.objects.filter(pk=titles[0].pk).update(
+            name='Мастер и Маргарита', description='Роман о дьяволе'
+        )
+        Title.objects.filter(pk=titles[1].pk).update(
+            description='Рецензия на роман Мастер и Маргарита'
+        )
+        Title.objects.filter(pk=titles[2].pk).update(
+            name='Мастерская', description='Повесть'
+        )
+        return titles
+
+    def test_name_ranked_first(self, client, library):
+        assert found_ids(client, {'search': 'мастер маргарита'}) == [
+            library[0].pk, library[1].pk, library[2].pk
+        ], 'Совпадения в названии должны быть выше совпадений в описании'
+
+    def test_prefix(self, client, library):
+        assert found_ids(client, {'search': 'маргар'}) == [
+            library[0].pk, library[1].pk
+        ]
+
+    def test_ordering_overrides_rank(self, client, library):
+        assert found_ids(
+            client, {'search': 'мастер', 'ordering': 'year'}
+        ) == [library[0].pk, library[1].pk, library[2].pk]
+
+    def test_index_rebuilt_after_change(self, client, admin_client,
+                                        library):
+        assert found_ids(client, {'search': 'воланд'}) == []
+        response = admin_client.patch(
+            f'{TITLES_URL}{library[3].pk}/',
+            {'description': 'Воланд в Москве'}, format='json'
+        )
+        assert response.status_code == 200
+        assert found_ids(client, {'search': 'воланд'}) == [library[3].pk], (
+            'Изменённое произведение должно находиться поиском'
+        )
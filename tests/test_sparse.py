@@ -0,0 +1,56 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_fields(self, client, titles):
+        response = client.get(f'{TITLES_URL}?fields=id,name,genre')
+        assert response.status_code == 200
+        genres = {
+            title.pk: {genre.slug for genre in title.genre.all()}
+            for title in titles
+        }
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'genre'}
+            assert {genre['slug'] for genre in title['genre']} == (
+                genres[title['id']]
+            )
+
+    def test_omit(self, client, titles):
+        response = client.get(f'{TITLES_URL}?omit=genre,category,description')
+        assert response.status_code == 200
+        assert set(response.json()['results'][0]) == {
+            'id', 'name', 'year', 'rating', 'review_count'
+        }
+
+    def test_fields_and_omit(self, client, titles):
+        response = client.get(f'{TITLES_URL}{titles[0].pk}/?fields=id,name'
+                              '&omit=name')
+        assert response.status_code == 200
+        assert response.json() == {'id': titles[0].pk}
+
+    @pytest.mark.parametrize('param', ['fields', 'omit'])
+    def test_unknown(self, client, titles, param):
+        from api.sparse import UNKNOWN_FIELDS
+
+        response = client.get(f'{TITLES_URL}?{param}=id,secret,pk')
+        assert response.status_code == 400, (
+            'Неизвестные поля должны давать 400'
+        )
+        assert response.json() == {
+            param: [UNKNOWN_FIELDS.format(names='pk, secret')]
+        }
+
+    def test_review_fields(self, client, titles, reviews):
+        response = client.get(
+            f'{TITLES_URL}{titles[0].pk}/reviews/?fields=author,score'
+        )
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert {review['author'] for review in results} == {
+            review.author.username for review in reviews
+        }
+        assert set(results[0]) == {'author', 'score'}
@@ -0,0 +1,54 @@
+import pytest
+
+STATS_URL = '/api/v1/titles/{pk}/stats/'
+
+
+def add_reviews(title, users, scores):
+    from reviews.models import Review
+
+    for user, score in zip(users, scores):
+        Review.objects.create(
+            title=title, author=user, text='Отзыв', score=score
+        )
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    @pytest.mark.parametrize('scores, median', [
+        ([7], 7),
+        ([1, 9, 3], 3),
+        ([2, 8, 5, 10], 6.5),
+        ([4, 4, 10, 10], 7),
+    ])
+    def test_median(self, client, titles, users, scores, median):
+        add_reviews(titles[1], users, scores)
+        response = client.get(STATS_URL.format(pk=titles[1].pk))
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == len(scores)
+        assert data['median'] == median
+        assert data['histogram'] == {
+            str(score): scores.count(score) for score in range(1, 11)
+        }
+        assert data['latest_pub_date'] is not None
+
+    def test_no_reviews(self, client, titles):
+        data = client.get(STATS_URL.format(pk=titles[1].pk)).json()
+        assert data['count'] == 0
+        assert data['median'] is None
+        assert set(data['histogram'].values()) == {0}
+
+    def test_missing_stats_row(self, client, titles):
+        from reviews.models import TitleStats
+
+        TitleStats.objects.filter(title=titles[1]).delete()
+        response = client.get(STATS_URL.format(pk=titles[1].pk))
+        assert response.status_code == 200, (
+            'Без строки статистики отдаются нулевые значения'
+        )
+        assert response.json()['count'] == 0
+
+    @pytest.mark.parametrize('pk', ['abc', '0'])
+    def test_not_found(self, client, titles, pk):
+        assert client.get(STATS_URL.format(pk=pk)).status_code == 404
@@ -0,0 +1,16 @@
+import pytest
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+
+
+@pytest.mark.django_db
+class TestAuthThrottle:
+
+    @pytest.mark.parametrize('body', [['username'], '"username"'])
+    def test_not_dict_body(self, client, body):
+        response = client.post(
+            SIGNUP_URL, body, content_type='application/json'
+        )
+        assert response.status_code == 400, (
+            'Тело запроса не словарём должно давать 400, а не ошибку сервера'
+        )